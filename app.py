@@ -1,23 +1,114 @@
 
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, json, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from os import environ
 from datetime import datetime
-
+from time import monotonic
+from operator import attrgetter
+from itertools import chain
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from threading import RLock, Event, Thread
+from types import SimpleNamespace
+import atexit
+from collections import OrderedDict, deque
+
+from sqlalchemy import and_, bindparam, case, event, select, tuple_
 from sqlalchemy.sql.elements import Null
+from sqlalchemy.orm import aliased
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
 
 app = Flask(__name__)
 # app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql+mysqlconnector://g2t4@127.0.0.1:3306/spm_lms' or 'mysql+mysqlconnector://root@127.0.0.1:3306/spm_lms'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql+mysqlconnector://g2t4@127.0.0.1:3306/spm_lms'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# buffer progress updates in memory and write them in batches, see Progress_buffer
+app.config['PROGRESS_WRITE_BEHIND'] = False
+app.config['PROGRESS_FLUSH_INTERVAL'] = 1.0
+app.config['PROGRESS_FLUSH_SIZE'] = 500
+# where workers share the generations of their caches, 'local', 'redis' or 'database', see Shared_generations
+app.config['CACHE_BACKEND'] = 'local'
+app.config['CACHE_REDIS_URL'] = 'redis://127.0.0.1:6379/0'
+app.config['CACHE_CHECK_INTERVAL'] = 1.0
 
 db = SQLAlchemy(app)
 
 CORS(app)  
 
+### Serializer Class ###
+class Serializer():
+    """
+    'Serializer' is built once per model at import time. It converts rows of
+    the model's columns, or instances of the model, into dictionaries in which
+    the keys correspond to database columns and string_columns are converted
+    to string, private_columns are left out
+    """
+    def __init__(self, model):
+        keys = tuple(key for key in model.__mapper__.column_attrs.keys() if key not in model.private_columns)
+        string_columns = model.string_columns
+        self.columns = tuple(getattr(model, key) for key in keys)
+        self.getter = attrgetter(*keys)
+        if not string_columns:
+            def row(values):
+                return dict(zip(keys, values))
+        else:
+            def row(values):
+                result = dict(zip(keys, values))
+                for column in string_columns:
+                    result[column] = str(result[column])
+                return result
+        self.row = row
+
+    def instance(self, instance):
+        return self.row(self.getter(instance))
+
+    def all(self, rows):
+        return list(map(self.row, rows))
+
+    def all_instances(self, instances):
+        return list(map(self.row, map(self.getter, instances)))
+
+
+class Related():
+    """
+    'Related' declares the columns of another model that rows of a model are
+    returned with. The rows are matched on the keys, columns with the same name
+    in both models, and fields maps each returned name to a column of the model
+    """
+    def __init__(self, model, keys, fields):
+        self.model = model
+        self.keys = keys
+        self.fields = fields
+
+
+class Serializable():
+    """
+    'Serializable' gives a model the to_dict method of its Serializer
+    """
+    string_columns = ()
+    private_columns = ()
+    serializer = None
+    related = {}
+
+    def to_dict(self):
+        """
+        'to_dict' converts the object into a dictionary,
+        in which the keys correspond to database columns
+        """
+        return self.serializer.instance(self)
+### Serializer Class ###
+
 ### Course Class ###
-class Course(db.Model):
+class Course(Serializable, db.Model):
     __tablename__ = 'course'
     CID = db.Column(db.String(64), primary_key=True)
     name = db.Column(db.String(64), nullable=False)
@@ -29,31 +120,17 @@ class Course(db.Model):
         self.name = name
         self.prerequisites = prerequisites
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"CID": self.CID, "name": self.name, 
         "prerequisites": self.prerequisites}
 
     def list_of_prerequisites(self):
-        if self.prerequisites.split(',')[0] == '':
-            return []
-        else:
-            return self.prerequisites.split(',')
+        return parse_prerequisites(self.prerequisites)
 ### Course Class ###
 
 
 ### Engineer Class ###
-class Engineer(db.Model):
+class Engineer(Serializable, db.Model):
     __tablename__ = 'engineer'
     EID = db.Column(db.Integer(), primary_key=True)
     name = db.Column(db.String(64), nullable=False)
@@ -71,25 +148,19 @@ class Engineer(db.Model):
         self.email = email
         self.address = address
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"EID": self.EID, "name": self.name, "password": self.password, "phone": self.phone, "email": self.email, "address": self.address}
 ### Engineer Class ###
 
 
 ### Academic record Class ###
-class Academic_record(db.Model):
+class Academic_record(Serializable, db.Model):
     __tablename__ = 'academic_record'
+    string_columns = ('start',)
+    __table_args__ = (
+        db.Index('academic_record_EID_status', 'EID', 'status'),
+        db.Index('academic_record_CID_status', 'CID', 'status'),
+    )
     EID = db.Column(db.Integer(), primary_key=True)
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
@@ -104,28 +175,16 @@ class Academic_record(db.Model):
         self.start = start
         self.status = status
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
-            else:
-                result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"EID": self.EID, "SID": self.SID, "CID": self.CID, "start": self.start, "status": self.status}
 ### Academic record Class ###
 
 
 ### Enrollment Class ###
-class Enrollment(db.Model):
+class Enrollment(Serializable, db.Model):
     __tablename__ = 'enrollment'
+    string_columns = ('start',)
+    related = {"course": Related(Course, ("CID",), {"course_name": "name"})}
     EID = db.Column(db.Integer(), primary_key=True)
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
@@ -138,28 +197,42 @@ class Enrollment(db.Model):
         self.CID = CID
         self.start = start
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
-            else:
-                result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"CID": self.CID, "EID": self.EID, "SID": self.SID, "start": self.start}
 ### Enrollment Class ###
 
 
+### Waitlist Class ###
+class Waitlist(Serializable, db.Model):
+    __tablename__ = 'waitlist'
+    string_columns = ('start',)
+    __table_args__ = (
+        db.UniqueConstraint('EID', 'SID', 'CID', 'start', name='waitlist_EID_SID_CID_start'),
+        db.Index('waitlist_SID_CID_start_id', 'SID', 'CID', 'start', 'id'),
+    )
+    id = db.Column(db.Integer(), primary_key=True, autoincrement=True)
+    EID = db.Column(db.Integer(), nullable=False)
+    SID = db.Column(db.String(64), nullable=False)
+    CID = db.Column(db.String(64), nullable=False)
+    start = db.Column(db.DateTime, nullable=False)
+
+
+    def __init__(self, EID, SID, CID, start):
+        self.EID = EID
+        self.SID = SID
+        self.CID = CID
+        self.start = start
+### Waitlist Class ###
+
+
 ### Section Class ###
-class Section(db.Model):
+class Section(Serializable, db.Model):
     __tablename__ = 'section'
+    string_columns = ('start', 'end')
+    __table_args__ = (
+        db.Index('section_TID', 'TID'),
+        db.Index('section_CID', 'CID'),
+    )
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
     start = db.Column(db.DateTime, nullable=False, primary_key=True)
@@ -177,29 +250,13 @@ class Section(db.Model):
         self.TID = TID
 
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
-            elif column == 'end':
-                result[column] = str(getattr(self, column))
-            else:
-                result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"SID": self.SID, "CID": self.CID, "start": self.start, "end": self.end ,"vacancy": self.vacancy, "TID": self.TID}
 ### Section Class ###
 
 
 ### Trainer Class ###
-class Trainer(db.Model):
+class Trainer(Serializable, db.Model):
     __tablename__ = 'trainer'
     TID = db.Column(db.Integer(), nullable=False, primary_key=True)
     name = db.Column(db.String(64), nullable=False)
@@ -217,25 +274,20 @@ class Trainer(db.Model):
         self.address = address
 
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"TID": self.TID, "name": self.name, "password": self.password, "phone": self.phone, "email": self.email, "address": self.address}
 ### Trainer Class ###
 
 # NEED TO CHANGE, REMOVE THIS AFTER CHANGE
 ### Content Class ###
-class Content(db.Model):
+class Content(Serializable, db.Model):
     __tablename__ = 'content'
+    string_columns = ('start',)
+    private_columns = ('ordinal',)
+    __table_args__ = (
+        db.Index('content_SID_CID_start', 'SID', 'CID', 'start'),
+        db.Index('content_lesson_ordinal', 'LID', 'SID', 'CID', 'start', 'ordinal', unique=True),
+    )
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
     LID = db.Column(db.String(64), primary_key=True)
@@ -243,8 +295,9 @@ class Content(db.Model):
     content_name = db.Column(db.String(64), primary_key=True)
     content_type = db.Column(db.String(64), nullable=False)
     link = db.Column(db.String(64), nullable=False)
+    ordinal = db.Column(db.Integer(), nullable=False)
 
-    def __init__(self, SID, CID, LID, start, content_name, content_type, link):
+    def __init__(self, SID, CID, LID, start, content_name, content_type, link, ordinal=None):
         self.SID = SID
         self.CID = CID
         self.LID = LID
@@ -252,33 +305,26 @@ class Content(db.Model):
         self.content_type = content_type
         self.content_name = content_name
         self.link = link
+        self.ordinal = ordinal
 
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
-            else:
-                result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"SID": self.SID, "CID": self.CID, "LID": self.LID, "start": self.start, "content_type": self.content_type ,"content_name": self.content_name, "link": self.link}
 ### Content Class ###
 
 ### Lesson Class ###
-class Lesson(db.Model):
+class Lesson(Serializable, db.Model):
     __tablename__ = 'lesson'
+    private_columns = ('next_ordinal',)
+    __table_args__ = (
+        db.Index('lesson_SID_CID_start', 'SID', 'CID', 'start'),
+    )
     LID = db.Column(db.String(64), primary_key=True)
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
     start = db.Column(db.DateTime, nullable=False, primary_key=True)
+    #the ordinal of the next content of the lesson, it only goes up so deleted contents never give their ordinal away
+    next_ordinal = db.Column(db.Integer(), nullable=False, default=0)
 
     
     def __init__(self, LID, SID, CID, start):
@@ -288,25 +334,14 @@ class Lesson(db.Model):
         self.start = start
 
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            result[column] = getattr(self, column)
-        return result
-
-
     def json(self):
         return {"LID": self.LID, "SID": self.SID, "CID": self.CID, "start": self.start}
 ### Lesson Class ###
 
 ### Quiz Questions Class ###
-class Quiz_questions(db.Model):
+class Quiz_questions(Serializable, db.Model):
     __tablename__ = 'quiz_questions'
+    string_columns = ('start',)
     LID = db.Column(db.String(64), primary_key=True)
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
@@ -329,28 +364,16 @@ class Quiz_questions(db.Model):
         self.type = type
 
 
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
-            else:
-                result[column] = getattr(self, column)
-        return result
-
     def json(self):
         return {"LID": self.LID, "SID": self.SID, "CID": self.CID, "start": self.start , "question": self.question,
                 "answer":self.answer, "options":self.options, "duration":self.duration, "type": self.type}
 ### Quiz Questions Class ###
 
 ### Progress Class ###
-class Progress(db.Model):
+class Progress(Serializable, db.Model):
     __tablename__ = 'progress'
+    string_columns = ('start',)
+    private_columns = ('viewed_bitmap', 'version')
     EID = db.Column(db.Integer(), primary_key=True)
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
@@ -358,9 +381,11 @@ class Progress(db.Model):
     latest_lesson_reached = db.Column(db.String(64))
     recent_content_name = db.Column(db.String(64))
     viewed_contents = db.Column(db.String(64))
+    viewed_bitmap = db.Column(db.BigInteger(), nullable=False, default=0)
+    version = db.Column(db.Integer(), nullable=False, default=0)
 
 
-    def __init__(self, EID, SID, CID, start, latest_lesson_reached,recent_content_name,viewed_contents):
+    def __init__(self, EID, SID, CID, start, latest_lesson_reached,recent_content_name,viewed_contents,viewed_bitmap=0,version=0):
         self.EID = EID
         self.SID = SID
         self.CID = CID
@@ -368,20 +393,8 @@ class Progress(db.Model):
         self.latest_lesson_reached = latest_lesson_reached
         self.recent_content_name = recent_content_name
         self.viewed_contents = viewed_contents
-
-    def to_dict(self):
-        """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
-        """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
-            else:
-                result[column] = getattr(self, column)
-        return result
+        self.viewed_bitmap = viewed_bitmap
+        self.version = version
 
     def json(self):
         return {"EID": self.EID, "SID": self.SID, "CID": self.CID, "start": self.start,
@@ -391,8 +404,9 @@ class Progress(db.Model):
 
 
 ### Quiz Record Class ###
-class Quiz_record(db.Model):
+class Quiz_record(Serializable, db.Model):
     __tablename__ = 'quiz_record'
+    string_columns = ('start',)
     EID = db.Column(db.Integer(), primary_key=True)
     SID = db.Column(db.String(64), primary_key=True)
     CID = db.Column(db.String(64), primary_key=True)
@@ -413,36 +427,1622 @@ class Quiz_record(db.Model):
         self.marks = marks
 
 
-    def to_dict(self):
+    def json(self):
+        return {"EID": self.EID, "LID": self.LID, "SID": self.SID, "CID": self.CID, "start": self.start , "question": self.question,
+                "answer_given":self.answer_given, "marks": self.marks}
+### Quiz record Class ###
+
+### Catalog Version Class ###
+class Catalog_version(db.Model):
+    __tablename__ = 'catalog_version'
+    name = db.Column(db.String(64), primary_key=True)
+    generation = db.Column(db.Integer(), nullable=False, default=0)
+
+    def __init__(self, name, generation=0):
+        self.name = name
+        self.generation = generation
+### Catalog Version Class ###
+
+### Serializers ###
+for model in (Course, Engineer, Academic_record, Enrollment, Waitlist, Section, Trainer, Content, Lesson, Quiz_questions, Progress, Quiz_record):
+    model.serializer = Serializer(model)
+
+
+def select_rows(query, model):
+    """
+    'select_rows' runs a query of a model selecting only its columns as tuples,
+    skipping ORM object hydration, and serializes every row like to_dict
+    """
+    return model.serializer.all(query.with_entities(*model.serializer.columns))
+
+
+def select_related(query, model, *names):
+    """
+    'select_related' is select_rows adding the fields of the related models
+    declared under names, every related model is outer joined into the same
+    query so the rows come back with one query whatever their number
+    """
+    columns = list(model.serializer.columns)
+    fields = []
+    for name in names:
+        related = model.related[name]
+        target = aliased(related.model)
+        query = query.outerjoin(target, and_(*(getattr(target, key) == getattr(model, key) for key in related.keys)))
+        columns.extend(getattr(target, column) for column in related.fields.values())
+        fields.extend(related.fields)
+    width = len(model.serializer.columns)
+    rows = list()
+    for row in query.with_entities(*columns):
+        result = model.serializer.row(row[:width])
+        result.update(zip(fields, row[width:]))
+        rows.append(result)
+    return rows
+### Serializers ###
+
+### Pagination ###
+def encode_cursor(values):
+    """
+    'encode_cursor' converts the primary key of the last row of a page into an opaque cursor
+    """
+    values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor, columns):
+    """
+    'decode_cursor' converts a cursor back into primary key values, raises
+    ValueError if the cursor is invalid or a value does not match the type of its column
+    """
+    values = json.loads(urlsafe_b64decode(cursor.encode()))
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError(f"Cursor {cursor} is invalid")
+    decoded = list()
+    for value, column in zip(values, columns):
+        #datetimes are encoded as isoformat strings
+        python_type = str if isinstance(column.type, db.DateTime) else column.type.python_type
+        if not isinstance(value, python_type) or isinstance(value, bool):
+            raise ValueError(f"Cursor {cursor} is invalid")
+        decoded.append(datetime.fromisoformat(value) if isinstance(column.type, db.DateTime) else value)
+    return decoded
+
+
+def read_page(query, model):
+    """
+    'read_page' serializes the rows of a query. When the request has a limit,
+    only one page ordered by the primary key is read, starting after the
+    optional 'after' cursor. Returns the rows and the fields to add to the
+    response, raises ValueError if limit or after is invalid
+    """
+    if "limit" not in request.args:
+        return select_rows(query, model), {}
+    limit = int(request.args["limit"])
+    if limit <= 0:
+        raise ValueError(f"Limit {limit} is invalid")
+    primary_key = model.__mapper__.primary_key
+    if "after" in request.args:
+        query = query.filter(tuple_(*primary_key) > tuple_(*decode_cursor(request.args["after"], primary_key)))
+    serializer = model.serializer
+    rows = query.with_entities(*serializer.columns).order_by(*primary_key).limit(limit + 1).all()
+    next_page = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        positions = [serializer.columns.index(getattr(model, column.key)) for column in primary_key]
+        next_page = encode_cursor([rows[-1][position] for position in positions])
+    return serializer.all(rows), {"next": next_page}
+### Pagination ###
+
+### Streaming ###
+def wants_stream():
+    """
+    'wants_stream' checks if the request asks for a streamed response with ?stream=true
+    """
+    return request.args.get("stream", "").lower() in ("1", "true")
+
+
+def stream_array(items, chunk_size=1000):
+    """
+    'stream_array' writes an iterable as a JSON array, chunk_size items at a time
+    """
+    yield "["
+    separator = ""
+    chunk = []
+    for item in items:
+        chunk.append(json.dumps(item))
+        if len(chunk) == chunk_size:
+            yield separator + ",".join(chunk)
+            separator = ","
+            chunk = []
+    if chunk:
+        yield separator + ",".join(chunk)
+    yield "]"
+
+
+def stream_rows(query, model, message, empty_message, chunk_size=1000):
+    """
+    'stream_rows' streams the serialized rows of a query as
+    {"data": [...], "message": message}. Rows are read from the database
+    chunk_size at a time so memory stays bounded whatever the result size
+    """
+    serializer = model.serializer
+    rows = iter(query.with_entities(*serializer.columns).yield_per(chunk_size))
+    first = next(rows, None)
+    if first is None:
+        return jsonify(
+            {
+                "message": empty_message
+            }
+        ), 500
+
+    def generate():
+        yield '{"data":'
+        yield from stream_array(map(serializer.row, chain([first], rows)), chunk_size)
+        yield ',"message":' + json.dumps(message) + '}'
+    return Response(stream_with_context(generate()), mimetype="application/json"), 200
+### Streaming ###
+
+### Indexes ###
+def full_table_scans(query):
+    """
+    'full_table_scans' runs EXPLAIN on a query and returns the tables that are
+    read with a full scan instead of an index lookup
+    """
+    statement = query.statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    if db.engine.dialect.name == 'sqlite':
+        plan = db.session.execute(f"EXPLAIN QUERY PLAN {statement}")
+        return [row.detail.split()[1] for row in plan if row.detail.startswith("SCAN")]
+    plan = db.session.execute(f"EXPLAIN {statement}").mappings()
+    return [row["table"] for row in plan if row["type"] in ("ALL", "index")]
+
+
+#columns declared on the models after spm_lms.sql was first loaded, with the value their existing rows take
+ADDED_COLUMNS = (
+    (Content.__table__.c.ordinal, 0),
+    (Lesson.__table__.c.next_ordinal, 0),
+    (Progress.__table__.c.viewed_bitmap, 0),
+    (Progress.__table__.c.version, 0),
+)
+
+
+def add_missing_columns():
+    """
+    'add_missing_columns' adds the columns of ADDED_COLUMNS that are missing from an existing
+    database and returns them, the ordinals of existing contents are then numbered per lesson
+    """
+    added = list()
+    for column, default in ADDED_COLUMNS:
+        present = [existing["name"] for existing in db.inspect(db.engine).get_columns(column.table.name)]
+        if column.name in present:
+            continue
+        column_type = column.type.compile(dialect=db.engine.dialect)
+        with db.engine.begin() as connection:
+            connection.execute(db.text(f"ALTER TABLE {column.table.name} ADD COLUMN {column.name} {column_type} NOT NULL DEFAULT {default}"))
+        added.append(column)
+    if Content.__table__.c.ordinal in added:
+        number_content_ordinals()
+    if Lesson.__table__.c.next_ordinal in added:
+        number_next_ordinals()
+    return added
+
+
+def number_content_ordinals():
+    """
+    'number_content_ordinals' numbers the contents of every lesson from 0 in the order of their names
+    """
+    table = Content.__table__
+    last = dict()
+    ordinals = list()
+    rows = db.session.query(table.c.LID, table.c.SID, table.c.CID, table.c.start, table.c.content_name).order_by(
+        table.c.LID, table.c.SID, table.c.CID, table.c.start, table.c.content_name)
+    for LID, SID, CID, start, content_name in rows:
+        lesson = (LID, SID, CID, start)
+        last[lesson] = last.get(lesson, -1) + 1
+        ordinals.append(dict(b_LID=LID, b_SID=SID, b_CID=CID, b_start=start, b_content_name=content_name, b_ordinal=last[lesson]))
+    if ordinals:
+        db.session.execute(table.update().where(and_(table.c.LID == bindparam('b_LID'), table.c.SID == bindparam('b_SID'),
+            table.c.CID == bindparam('b_CID'), table.c.start == bindparam('b_start'), table.c.content_name == bindparam('b_content_name')))
+            .values(ordinal=bindparam('b_ordinal')), ordinals)
+    db.session.commit()
+
+
+def number_next_ordinals():
+    """
+    'number_next_ordinals' sets the next ordinal of every lesson after the last ordinal of its contents
+    """
+    lesson = Lesson.__table__
+    content = Content.__table__
+    highest = select(db.func.coalesce(db.func.max(content.c.ordinal) + 1, 0)).where(and_(content.c.LID == lesson.c.LID,
+        content.c.SID == lesson.c.SID, content.c.CID == lesson.c.CID, content.c.start == lesson.c.start)).scalar_subquery()
+    db.session.execute(lesson.update().values(next_ordinal=highest))
+    db.session.commit()
+
+
+@app.cli.command("create_indexes")
+def create_indexes():
+    """
+    Create the tables, columns and indexes declared on the models that are missing from an existing database
+    """
+    for table in db.metadata.sorted_tables:
+        if not db.inspect(db.engine).has_table(table.name):
+            table.create(bind=db.engine)
+            print(f"Table {table.name} is created")
+    for column in add_missing_columns():
+        print(f"Column {column.name} is added to {column.table.name}")
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=db.engine, checkfirst=True)
+            print(f"Index {index.name} on {table.name} is present")
+### Indexes ###
+
+### Shared Generations ###
+class Local_generation():
+    """
+    'Local_generation' keeps the generations in the process, for a single worker
+    """
+    def __init__(self):
+        self.values = {}
+
+    def generation(self, name):
+        return self.values.get(name, 0)
+
+    def bump(self, name):
+        self.values[name] = self.values.get(name, 0) + 1
+        return self.values[name]
+
+
+class Redis_generation():
+    """
+    'Redis_generation' keeps each generation in a key of a Redis client, or of
+    any client with the same get and incr, which every worker reads
+    """
+    def __init__(self, client, prefix='generation:'):
+        self.client = client
+        self.prefix = prefix
+
+    def generation(self, name):
+        return int(self.client.get(self.prefix + name) or 0)
+
+    def bump(self, name):
+        return int(self.client.incr(self.prefix + name))
+
+
+class Database_generation():
+    """
+    'Database_generation' keeps each generation in a row of the catalog_version
+    table, which every worker reads with one primary key lookup
+    """
+    def generation(self, name):
+        return db.session.query(Catalog_version.generation).filter_by(name=name).scalar() or 0
+
+    def bump(self, name):
+        # the transaction of the session has committed, the row is written on a connection of its own
+        table = Catalog_version.__table__
+        with db.engine.begin() as connection:
+            updated = connection.execute(table.update().where(table.c.name == name)
+                                         .values(generation=table.c.generation + 1)).rowcount
+            if updated == 0:
+                connection.execute(table.insert().values(name=name, generation=1))
+            return connection.execute(select(table.c.generation).where(table.c.name == name)).scalar()
+
+
+def generation_backend(config):
+    """
+    'generation_backend' creates the generation backend named by CACHE_BACKEND
+    """
+    backend = config.get('CACHE_BACKEND', 'local')
+    if backend == 'redis':
+        if redis is None:
+            raise RuntimeError("redis is not installed, the caches cannot use the redis backend")
+        return Redis_generation(redis.Redis.from_url(config['CACHE_REDIS_URL']))
+    if backend == 'database':
+        return Database_generation()
+    return Local_generation()
+
+
+class Shared_generations():
+    """
+    'Shared_generations' keeps the named generations that the caches of this worker share
+    with the other workers through a backend. A cache stamps each entry with the generation
+    read before loading it. The entry stays valid until another worker moves the generation,
+    or this worker commits a change to the key of the entry. The backend is read at most once
+    every interval seconds, changes committed by this worker are seen at once
+    """
+    def __init__(self, backend, interval=0):
+        self.lock = RLock()
+        self.backend = backend
+        self.interval = interval
+        self.names = {}
+
+    def use(self, backend):
+        with self.lock:
+            self.backend = backend
+            self.names = {}
+
+    def reset(self):
+        with self.lock:
+            self.names = {}
+
+    def current(self, name):
         """
-        'to_dict' converts the object into a dictionary,
-        in which the keys correspond to database columns
+        'current' returns the generation to stamp an entry loaded from now on with
         """
-        columns = self.__mapper__.column_attrs.keys()
-        result = {}
-        for column in columns:
-            if column == 'start':
-                result[column] = str(getattr(self, column))
+        now = monotonic()
+        with self.lock:
+            state = self.names.get(name)
+            if state is None or now - state.checked >= self.interval:
+                generation = self.backend.generation(name)
+                if state is None or generation != state.seen:
+                    # another worker changed something, every entry loaded before is dropped
+                    state = self.names[name] = SimpleNamespace(seen=generation, valid_from=generation, changed={}, checked=now)
+                state.checked = now
+            return state.seen
+
+    def valid(self, name, key, stamp):
+        """
+        'valid' checks if an entry of key stamped with stamp is still valid
+        """
+        with self.lock:
+            state = self.names.get(name)
+            return state is not None and state.valid_from <= stamp <= state.seen and stamp >= state.changed.get(key, stamp)
+
+    def changed(self, name, keys):
+        """
+        'changed' moves the generation after this worker committed a change to keys
+        """
+        generation = self.backend.bump(name)
+        with self.lock:
+            state = self.names.get(name)
+            if state is not None and generation == state.seen + 1:
+                # no other worker moved the generation, only the entries of keys are dropped
+                state.seen = generation
+                for key in keys:
+                    state.changed[key] = generation
+            else:
+                self.names[name] = SimpleNamespace(seen=generation, valid_from=generation, changed={}, checked=monotonic())
+
+
+shared_generations = Shared_generations(generation_backend(app.config), app.config['CACHE_CHECK_INTERVAL'])
+### Shared Generations ###
+
+### Course Catalog ###
+class Course_catalog():
+    """
+    'Course_catalog' is a process wide read-through cache of the course table keyed by CID.
+    The table is read with one query and served from memory until the course generation
+    moves, writes to the course table move it once they commit so every worker reloads
+    """
+    def __init__(self, generations):
+        self.lock = RLock()
+        self.generations = generations
+        self.generation = None
+        self.courses = {}
+
+    def invalidate(self):
+        with self.lock:
+            self.generation = None
+
+    def changed(self):
+        self.generations.changed("course", ["catalog"])
+
+    def refresh(self):
+        # the generation is read before the rows, a write committed in between reloads them again
+        generation = self.generations.current("course")
+        with self.lock:
+            if self.generation is None or not self.generations.valid("course", "catalog", self.generation):
+                rows = db.session.query(*Course.serializer.columns).all()
+                self.courses = {course["CID"]: course for course in Course.serializer.all(rows)}
+                self.generation = generation
+        return self
+
+    def get(self, CID):
+        return self.refresh().courses.get(CID)
+
+    def all(self):
+        return list(self.refresh().courses.values())
+
+
+course_catalog = Course_catalog(shared_generations)
+### Course Catalog ###
+
+### Prerequisite Graph ###
+def parse_prerequisites(prerequisites):
+    """
+    'parse_prerequisites' splits a comma separated prerequisites string into a
+    list of CID, stripping spaces and dropping empty or repeated entries
+    """
+    result = []
+    for CID in (prerequisites or '').split(','):
+        CID = CID.strip()
+        if CID and CID not in result:
+            result.append(CID)
+    return result
+
+
+class Prerequisite_graph():
+    """
+    'Prerequisite_graph' is a process wide index of the course prerequisites.
+    The course catalog is parsed once into a DAG which is topologically sorted,
+    and the transitive closure of every course is precomputed. The index is
+    rebuilt on next use whenever the course catalog reloads
+    """
+    def __init__(self):
+        self.lock = RLock()
+        self.stale = True
+        self.source = None
+        self.version = 0
+        self.courses = {}
+        self.prerequisites = {}
+        self.closure = {}
+        self.order = []
+        self.cyclic = set()
+
+    def invalidate(self):
+        self.stale = True
+
+    def refresh(self):
+        courses = course_catalog.refresh().courses
+        if self.stale or self.source is not courses:
+            with self.lock:
+                if self.stale or self.source is not courses:
+                    self.stale = False
+                    self.source = courses
+                    self.build([(course["CID"], course["name"], course["prerequisites"]) for course in courses.values()])
+        return self
+
+    def build(self, courses):
+        """
+        'build' indexes a list of (CID, name, prerequisites) rows
+        """
+        prerequisites = {CID: tuple(parse_prerequisites(text)) for CID, name, text in courses}
+
+        # Kahn's algorithm, prerequisites outside of the catalog are treated as leaves
+        dependents = {CID: [] for CID in prerequisites}
+        pending = {}
+        for CID, prereqs in prerequisites.items():
+            pending[CID] = 0
+            for prereq in prereqs:
+                if prereq in dependents:
+                    dependents[prereq].append(CID)
+                    pending[CID] += 1
+        order = [CID for CID, count in pending.items() if count == 0]
+        for CID in order:
+            for dependent in dependents[CID]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    order.append(dependent)
+
+        closure = {}
+        for CID in order:
+            reachable = set(prerequisites[CID])
+            for prereq in prerequisites[CID]:
+                reachable |= closure.get(prereq, frozenset())
+            closure[CID] = frozenset(reachable)
+
+        # courses on (or depending on) a cycle cannot be sorted, walk them directly
+        cyclic = set(prerequisites) - set(order)
+        for CID in cyclic:
+            reachable = set()
+            stack = list(prerequisites[CID])
+            while stack:
+                prereq = stack.pop()
+                if prereq not in reachable:
+                    reachable.add(prereq)
+                    stack.extend(prerequisites.get(prereq, ()))
+            closure[CID] = frozenset(reachable)
+
+        self.courses = {CID: {"CID": CID, "name": name, "prerequisites": text} for CID, name, text in courses}
+        self.prerequisites, self.closure, self.order, self.cyclic = prerequisites, closure, order, cyclic
+        self.version += 1
+
+    def __contains__(self, CID):
+        return CID in self.refresh().prerequisites
+
+    def prerequisites_of(self, CID):
+        return list(self.refresh().prerequisites.get(CID, ()))
+
+    def all_prerequisites_of(self, CID):
+        return self.refresh().closure.get(CID, frozenset())
+
+    def creates_cycle(self, CID, prerequisites):
+        """
+        'creates_cycle' checks if setting the prerequisites of CID would create a cycle
+        """
+        closure = self.refresh().closure
+        for prereq in parse_prerequisites(prerequisites):
+            if prereq == CID or CID in closure.get(prereq, ()):
+                return True
+        return False
+
+
+prerequisite_graph = Prerequisite_graph()
+
+
+def mark_quiz_changed(session, LID, SID, CID, start):
+    """
+    'mark_quiz_changed' records a quiz whose questions are written in the
+    current transaction, its answer key is dropped once it commits
+    """
+    session.info.setdefault("quizzes_changed", set()).add(quiz_key(LID, SID, CID, start))
+
+
+def mark_engineers_changed(session, EIDs):
+    """
+    'mark_engineers_changed' records engineers whose academic records are
+    written in the current transaction, they are refreshed once it commits
+    """
+    session.info.setdefault("engineers_changed", set()).update(EIDs)
+
+
+@event.listens_for(db.session, "after_flush")
+def track_catalog_changes(session, flush_context):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, Course):
+            session.info["catalog_changed"] = True
+        elif isinstance(instance, (Academic_record, Engineer)):
+            mark_engineers_changed(session, [instance.EID])
+        elif isinstance(instance, Quiz_questions):
+            mark_quiz_changed(session, instance.LID, instance.SID, instance.CID, instance.start)
+
+
+@event.listens_for(db.session, "after_bulk_update")
+@event.listens_for(db.session, "after_bulk_delete")
+def track_bulk_catalog_changes(context):
+    if context.mapper.class_ is Course:
+        context.session.info["catalog_changed"] = True
+
+
+@event.listens_for(db.session, "after_commit")
+def refresh_catalog_indexes(session):
+    if session.info.pop("catalog_changed", False):
+        course_catalog.changed()
+    eligibility_store.changed(session.info.pop("engineers_changed", ()))
+    answer_keys.changed(session.info.pop("quizzes_changed", ()))
+
+
+@event.listens_for(db.session, "after_soft_rollback")
+def discard_catalog_changes(session, previous_transaction):
+    session.info.pop("catalog_changed", None)
+    session.info.pop("engineers_changed", None)
+    session.info.pop("quizzes_changed", None)
+
+
+@event.listens_for(db.metadata, "after_create")
+@event.listens_for(db.metadata, "after_drop")
+def reset_catalog_indexes(target, connection, **kw):
+    shared_generations.reset()
+    course_catalog.invalidate()
+    prerequisite_graph.invalidate()
+    eligibility_store.invalidate()
+    answer_keys.invalidate()
+### Prerequisite Graph ###
+
+### Viewed Contents ###
+#a content is recorded in the viewed bitmap of a progress record when its ordinal fits into a signed BIGINT,
+#any other content is recorded by name in viewed_contents
+VIEWED_BITMAP_SIZE = 63
+
+
+def content_ordinals(LID, SID, CID, start):
+    """
+    'content_ordinals' returns the content names of a lesson in the order of their ordinals
+    """
+    rows = db.session.query(Content.ordinal, Content.content_name).filter_by(LID=LID, SID=SID, CID=CID, start=start).order_by(Content.ordinal)
+    return [(ordinal, content_name) for ordinal, content_name in rows]
+
+
+def viewed_content_names(progress, LID):
+    """
+    'viewed_content_names' decodes the viewed bitmap and viewed_contents of a progress record into content names
+    """
+    contents = list()
+    if progress.viewed_bitmap:
+        for ordinal, content_name in content_ordinals(LID, progress.SID, progress.CID, progress.start):
+            if ordinal < VIEWED_BITMAP_SIZE and progress.viewed_bitmap >> ordinal & 1:
+                contents.append(content_name)
+    for content_name in (progress.viewed_contents or "").split("|"):
+        if content_name and content_name not in contents:
+            contents.append(content_name)
+    return contents
+
+
+@event.listens_for(db.session, "before_flush")
+def assign_content_ordinals(session, flush_context, instances):
+    """
+    'assign_content_ordinals' numbers new contents from the next ordinal of their lesson,
+    ordinals are never reused so the viewed bitmaps of existing progress records stay valid.
+    The lesson row is locked before its next ordinal is read, so concurrent inserts into
+    one lesson are numbered one after another
+    """
+    table = Lesson.__table__
+    new_lessons = dict()
+    for instance in session.new:
+        if isinstance(instance, Lesson):
+            start = datetime.fromisoformat(instance.start) if isinstance(instance.start, str) else instance.start
+            new_lessons[(instance.LID, instance.SID, instance.CID, start)] = instance
+    last = dict()
+    for instance in session.new:
+        if isinstance(instance, Content) and instance.ordinal is None:
+            start = instance.start
+            if isinstance(start, str):
+                start = datetime.fromisoformat(start)
+            lesson = (instance.LID, instance.SID, instance.CID, start)
+            if lesson not in last:
+                if lesson in new_lessons:
+                    next_ordinal = new_lessons[lesson].next_ordinal or 0
+                else:
+                    with session.no_autoflush:
+                        next_ordinal = session.query(Lesson.next_ordinal).filter(Lesson.LID == instance.LID, Lesson.SID == instance.SID,
+                            Lesson.CID == instance.CID, Lesson.start == start).with_for_update().scalar() or 0
+                        #contents numbered before the lesson kept its next ordinal
+                        highest = session.query(db.func.max(Content.ordinal)).filter(Content.LID == instance.LID,
+                            Content.SID == instance.SID, Content.CID == instance.CID, Content.start == start).scalar()
+                    if highest is not None:
+                        next_ordinal = max(next_ordinal, highest + 1)
+                last[lesson] = next_ordinal - 1
+            last[lesson] += 1
+            instance.ordinal = last[lesson]
+    for lesson, ordinal in last.items():
+        if lesson in new_lessons:
+            new_lessons[lesson].next_ordinal = ordinal + 1
+        else:
+            session.execute(table.update().where(and_(table.c.LID == lesson[0], table.c.SID == lesson[1], table.c.CID == lesson[2],
+                table.c.start == lesson[3])).values(next_ordinal=ordinal + 1))
+### Viewed Contents ###
+
+### Progress Buffer ###
+def update_progress(EID, SID, CID, start, change, retries=100):
+    """
+    'update_progress' writes the values returned by change(progress) with an UPDATE
+    conditional on the version of the progress record, which is read again and
+    retried when another write got in first. It commits and returns the values
+    written, or None if the progress record does not exist. When change returns
+    no values nothing is written
+    """
+    record = Progress.query.filter_by(EID=EID, SID=SID, CID=CID, start=start)
+    for attempt in range(retries):
+        progress = record.populate_existing().first()
+        if progress is None:
+            return None
+        values = change(progress)
+        if not values:
+            return values
+        if record.filter_by(version=progress.version).update(dict(values, version=Progress.version + 1), synchronize_session=False):
+            db.session.commit()
+            return values
+        db.session.rollback()
+    raise RuntimeError(f"Progress record {EID, SID, CID, start} is updated concurrently, retried {retries} times")
+
+
+def progress_key(EID, SID, CID, start):
+    """
+    'progress_key' builds the buffer key of a progress record
+    """
+    if isinstance(start, str):
+        start = datetime.fromisoformat(start)
+    return (int(EID), str(SID), str(CID), start)
+
+
+class Progress_buffer():
+    """
+    'Progress_buffer' coalesces progress updates per progress record in memory when
+    PROGRESS_WRITE_BEHIND is set. Pending updates are written with one executemany
+    UPDATE per column every PROGRESS_FLUSH_INTERVAL seconds, as soon as
+    PROGRESS_FLUSH_SIZE records are pending, and when the process exits.
+    Pending updates are keyed by progress record and lesson, viewed contents are
+    only written while their lesson is still the latest lesson reached
+    """
+    def __init__(self):
+        self.lock = RLock()
+        self.pending = dict()
+        self.wake = Event()
+        self.thread = None
+
+    def enabled(self):
+        return bool(app.config.get('PROGRESS_WRITE_BEHIND'))
+
+    def merge(self, key, recent_content_name=None, viewed_bitmap=0, content_names=()):
+        with self.lock:
+            change = self.pending.setdefault(key, dict(viewed_bitmap=0, viewed_contents=[]))
+            if recent_content_name is not None:
+                change["recent_content_name"] = recent_content_name
+            change["viewed_bitmap"] |= viewed_bitmap
+            for content_name in content_names:
+                if content_name not in change["viewed_contents"]:
+                    change["viewed_contents"].append(content_name)
+            return len(self.pending)
+
+    def record(self, key, LID=None, recent_content_name=None, viewed_bitmap=0, content_name=None):
+        """
+        'record' buffers an update of the progress record of key, contents viewed belong to lesson LID
+        """
+        size = self.merge(key + (LID,), recent_content_name, viewed_bitmap, () if content_name is None else (content_name,))
+        self.start()
+        if size >= app.config.get('PROGRESS_FLUSH_SIZE', 500):
+            if self.thread is None:
+                self.flush()
             else:
-                result[column] = getattr(self, column)
+                self.wake.set()
+
+    def view(self, progress):
+        """
+        'view' returns the progress record with its pending updates applied
+        """
+        values = {key: getattr(progress, key) for key in Progress.__mapper__.column_attrs.keys()}
+        key = progress_key(progress.EID, progress.SID, progress.CID, progress.start)
+        with self.lock:
+            for LID in (None, progress.latest_lesson_reached):
+                change = self.pending.get(key + (LID,))
+                if change is None:
+                    continue
+                if "recent_content_name" in change:
+                    values["recent_content_name"] = change["recent_content_name"]
+                values["viewed_bitmap"] = (values["viewed_bitmap"] or 0) | change["viewed_bitmap"]
+                if change["viewed_contents"]:
+                    values["viewed_contents"] = merge_viewed_contents(values["viewed_contents"], change["viewed_contents"])
+        return SimpleNamespace(**values)
+
+    def flush(self, retries=100):
+        """
+        'flush' writes every pending update in one transaction and commits it, it returns the
+        number of progress records written. When another write got in first the transaction
+        is rolled back and written again, updates that are not committed are pending again
+        """
+        with self.lock:
+            pending, self.pending = self.pending, dict()
+        if not pending:
+            return 0
+        try:
+            for attempt in range(retries):
+                if self.write(pending):
+                    db.session.commit()
+                    return len({key[:4] for key in pending})
+                db.session.rollback()
+            raise RuntimeError(f"Progress records {list(pending)} are updated concurrently, retried {retries} times")
+        except Exception:
+            db.session.rollback()
+            #put the updates back in front of anything recorded since
+            with self.lock:
+                newer, self.pending = self.pending, pending
+                for key, change in newer.items():
+                    self.merge(key, change.get("recent_content_name"), change["viewed_bitmap"], change["viewed_contents"])
+            raise
+
+    def write(self, pending):
+        """
+        'write' runs the updates of flush without committing, it returns False when a
+        progress record changed between reading and writing its viewed contents
+        """
+        table = Progress.__table__
+        where = and_(table.c.EID == bindparam('b_EID'), table.c.SID == bindparam('b_SID'),
+            table.c.CID == bindparam('b_CID'), table.c.start == bindparam('b_start'))
+        keys = lambda key: dict(b_EID=key[0], b_SID=key[1], b_CID=key[2], b_start=key[3])
+        #viewed contents kept by name are merged into the stored string, with an UPDATE conditional on the version read
+        named = list(dict.fromkeys(key[:4] for key, change in pending.items() if change["viewed_contents"]))
+        if named:
+            rows = db.session.query(table.c.EID, table.c.SID, table.c.CID, table.c.start, table.c.latest_lesson_reached,
+                table.c.viewed_contents, table.c.version).filter(tuple_(table.c.EID, table.c.SID, table.c.CID, table.c.start).in_(named))
+            read = {tuple(row[:4]): dict(row._mapping) for row in rows}
+            for key, change in pending.items():
+                progress = read.get(key[:4])
+                if not change["viewed_contents"] or progress is None or progress["latest_lesson_reached"] != key[4]:
+                    continue
+                viewed_contents = merge_viewed_contents(progress["viewed_contents"], change["viewed_contents"])
+                result = db.session.execute(table.update().where(and_(where, table.c.version == bindparam('b_version'))).values(
+                    viewed_contents=viewed_contents, version=table.c.version + 1), dict(keys(key), b_version=progress["version"]))
+                if result.rowcount == 0:
+                    return False
+                progress.update(viewed_contents=viewed_contents, version=progress["version"] + 1)
+        recent = [dict(keys(key), b_recent=change["recent_content_name"]) for key, change in pending.items() if "recent_content_name" in change]
+        if recent:
+            db.session.execute(table.update().where(where).values(recent_content_name=bindparam('b_recent'), version=table.c.version + 1), recent)
+        #a bit is set only while its lesson is the latest lesson reached, the bitmap is cleared when the next lesson is unlocked
+        viewed = [dict(keys(key), b_LID=key[4], b_bitmap=change["viewed_bitmap"]) for key, change in pending.items() if change["viewed_bitmap"]]
+        if viewed:
+            db.session.execute(table.update().where(and_(where, table.c.latest_lesson_reached == bindparam('b_LID'))).values(
+                viewed_bitmap=table.c.viewed_bitmap.op('|')(bindparam('b_bitmap')), version=table.c.version + 1), viewed)
+        return True
+
+    def start(self):
+        """
+        'start' runs the timed flush in a background thread, unless PROGRESS_FLUSH_INTERVAL is None
+        """
+        interval = app.config.get('PROGRESS_FLUSH_INTERVAL')
+        with self.lock:
+            if self.thread is not None or interval is None:
+                return
+            self.thread = Thread(target=self.run, args=(interval,), daemon=True)
+        self.thread.start()
+
+    def run(self, interval):
+        while True:
+            self.wake.wait(interval)
+            self.wake.clear()
+            with app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    app.logger.exception("Progress updates are not written, retrying")
+                finally:
+                    db.session.remove()
+
+
+def merge_viewed_contents(viewed_contents, content_names):
+    """
+    'merge_viewed_contents' appends content names to a pipe-joined viewed_contents string
+    """
+    contents = (viewed_contents or "").split("|")
+    for content_name in content_names:
+        if content_name not in contents:
+            contents.append(content_name)
+    return "|".join(contents)
+
+
+progress_buffer = Progress_buffer()
+
+
+@atexit.register
+def flush_progress_buffer():
+    """
+    'flush_progress_buffer' writes the pending progress updates when the process exits
+    """
+    if progress_buffer.pending:
+        with app.app_context():
+            progress_buffer.flush()
+### Progress Buffer ###
+
+### Seat Reservation ###
+def reserve_seat(SID, CID, start):
+    """
+    'reserve_seat' takes a seat of a section with one UPDATE conditional on vacancy > 0,
+    it returns False when the section is full or does not exist. The seat belongs to the
+    current transaction and is given back if it rolls back, the row lock it takes is held
+    until commit so it is called right before committing
+    """
+    return reserve_seats(SID, CID, start, 1) == 1
+
+
+def reserve_seats(SID, CID, start, seats):
+    """
+    'reserve_seats' takes up to seats seats of a section and returns the number taken,
+    all of them with one conditional UPDATE when the section has enough vacancy
+    """
+    section = Section.query.filter(Section.SID == SID, Section.CID == CID, Section.start == start)
+    while seats > 0:
+        if section.filter(Section.vacancy >= seats).update({Section.vacancy: Section.vacancy - seats}, synchronize_session=False) == 1:
+            return seats
+        vacancy = section.with_entities(Section.vacancy).with_for_update().scalar()
+        if vacancy == None or vacancy <= 0:
+            return 0
+        seats = min(seats, vacancy)
+    return 0
+
+
+def release_seats(SID, CID, start, seats=1):
+    """
+    'release_seats' gives seats of a section back
+    """
+    Section.query.filter(Section.SID == SID, Section.CID == CID, Section.start == start).update(
+        {Section.vacancy: Section.vacancy + seats}, synchronize_session=False)
+
+
+def section_exists(SID, CID, start):
+    return Section.query.filter_by(SID=SID, CID=CID, start=start).first() != None
+
+
+def no_seat_message(SID, CID, start, action):
+    """
+    'no_seat_message' explains why a seat of a section could not be reserved
+    """
+    if not section_exists(SID, CID, start):
+        return f"Section {SID, CID} does not exist, {action}"
+    return f"Section {SID, CID} has no vacancy, {action}"
+
+
+def promote_waitlist(SID, CID, start, seats=1):
+    """
+    'promote_waitlist' gives seats of a section to the engineers at the head of its waitlist,
+    it returns the EIDs enrolled. The head is found through the (SID, CID, start, id) index
+    and read with a locking read, so concurrent withdrawals promote different engineers
+    """
+    promoted = list()
+    while len(promoted) < seats:
+        head = db.session.query(Waitlist.id, Waitlist.EID).filter_by(SID=SID, CID=CID, start=start).order_by(Waitlist.id).with_for_update().first()
+        if head == None:
+            break
+        if Waitlist.query.filter_by(id=head.id).delete(synchronize_session=False) == 0:
+            continue
+        if Academic_record.query.filter_by(EID=head.EID, SID=SID, CID=CID, start=start).first() != None:
+            continue
+        db.session.add(Academic_record(EID=head.EID, SID=SID, CID=CID, start=start, status="ongoing"))
+        promoted.append(head.EID)
+    return promoted
+
+
+def free_seats(SID, CID, start, seats=1):
+    """
+    'free_seats' hands freed seats of a section to its waitlist and gives back the ones nobody is waiting for
+    """
+    promoted = promote_waitlist(SID, CID, start, seats)
+    if len(promoted) < seats:
+        release_seats(SID, CID, start, seats - len(promoted))
+    return promoted
+
+
+def waitlist_waiting(SID, CID, start):
+    """
+    'waitlist_waiting' checks if an engineer is waiting for a seat of a section,
+    new approvals then join the waitlist so seats go out first come first served
+    """
+    return db.session.query(Waitlist.id).filter_by(SID=SID, CID=CID, start=start).first() != None
+
+
+def fill_from_waitlist(SID, CID, start):
+    """
+    'fill_from_waitlist' gives the vacancy of a section to the head of its waitlist, it returns the EIDs enrolled
+    """
+    waiting = Waitlist.query.filter_by(SID=SID, CID=CID, start=start).count()
+    seats = reserve_seats(SID, CID, start, waiting) if waiting > 0 else 0
+    return free_seats(SID, CID, start, seats) if seats > 0 else []
+### Seat Reservation ###
+
+### Bulk Registration ###
+def read_bulk_records(data):
+    """
+    'read_bulk_records' reads the (EID, SID, CID, start) records of a bulk request, it returns
+    the key of each record and its result, a record with a missing or invalid field or repeated
+    in the request has no key and has already failed
+    """
+    keys = list()
+    results = list()
+    seen = set()
+    for record in data["records"]:
+        result = {field: record.get(field) for field in ["EID", "SID", "CID", "start"]}
+        not_present = [field for field in ["EID", "CID", "SID", "start"] if field not in record.keys()]
+        key = None
+        if not_present:
+            result.update(success=False, message=f"{not_present} is not present")
+        else:
+            try:
+                key = (int(record["EID"]), record["SID"], record["CID"], datetime.fromisoformat(record["start"]))
+            except (ValueError, TypeError):
+                result.update(success=False, message=f"EID {record['EID']} or start {record['start']} is invalid")
+        if key in seen:
+            result.update(success=False, message=f"{record['EID']} is repeated in the request")
+            key = None
+        elif key != None:
+            seen.add(key)
+        keys.append(key)
+        results.append(result)
+    return keys, results
+
+
+def record_keys(model, keys, **values):
+    """
+    'record_keys' returns which (EID, SID, CID, start) keys have a row in the table of model,
+    optionally with the given column values, with one query
+    """
+    keys = [key for key in keys if key != None]
+    if not keys:
+        return set()
+    columns = (model.EID, model.SID, model.CID, model.start)
+    return {tuple(row) for row in db.session.query(*columns).filter(tuple_(*columns).in_(keys)).filter_by(**values)}
+
+
+def delete_record_keys(model, keys):
+    """
+    'delete_record_keys' deletes the rows of the (EID, SID, CID, start) keys with one DELETE
+    """
+    if keys:
+        columns = (model.EID, model.SID, model.CID, model.start)
+        model.query.filter(tuple_(*columns).in_(keys)).delete(synchronize_session=False)
+
+
+def insert_record_keys(model, keys, **values):
+    """
+    'insert_record_keys' inserts a row for each (EID, SID, CID, start) key with one multi-row INSERT
+    """
+    if keys:
+        db.session.execute(model.__table__.insert(), [dict(EID=key[0], SID=key[1], CID=key[2], start=key[3], **values) for key in keys])
+
+
+def record_keys_of_sections(keys):
+    """
+    'record_keys_of_sections' returns which (SID, CID, start) sections of the keys exist, with one query
+    """
+    sections = {key[1:] for key in keys if key != None}
+    if not sections:
+        return set()
+    columns = (Section.SID, Section.CID, Section.start)
+    return {tuple(row) for row in db.session.query(*columns).filter(tuple_(*columns).in_(sections))}
+
+
+def group_by_section(keys):
+    """
+    'group_by_section' groups (EID, SID, CID, start) keys by their (SID, CID, start) section. The
+    sections are sorted so that concurrent requests lock the rows of their sections in one order
+    """
+    sections = dict()
+    for key in keys:
+        sections.setdefault(key[1:], []).append(key)
+    return dict(sorted(sections.items()))
+
+
+def bulk_response(results, action):
+    """
+    'bulk_response' reports the result of every record of a bulk request
+    """
+    for result in results:
+        result.setdefault("success", True)
+    succeeded = sum(result["success"] for result in results)
+    return jsonify(
+        {
+            "message": f"{succeeded} of {len(results)} records are {action}",
+            "data": results
+        }
+    ), 200
+### Bulk Registration ###
+
+### Single Statement Writes ###
+def write_rows(query, values=None):
+    """
+    'write_rows' runs one UPDATE setting values, or one DELETE when values is None, on the rows
+    matched by query and returns how many rows it wrote, which tells whether the rows existed
+    """
+    if values is None:
+        return query.delete()
+    return query.update(values)
+
+
+def write_response(count, message, not_found_message):
+    """
+    'write_response' commits a write that matched rows and returns message, or rolls back a write
+    that matched nothing and returns not_found_message
+    """
+    if count == 0:
+        db.session.rollback()
+        return jsonify(
+            {
+                "message": not_found_message
+            }
+        ), 500
+    db.session.commit()
+    return jsonify(
+        {
+            "message": message
+        }
+    ), 200
+### Single Statement Writes ###
+
+### Progress Events ###
+#the fields each type of progress event needs besides EID, SID, CID and start
+PROGRESS_EVENTS = {
+    "content_opened": ["content_name"],
+    "content_viewed": ["LID", "content_name"],
+    "lesson_completed": ["LID"],
+}
+
+
+def apply_progress_event(progress, progress_event, ordinal):
+    """
+    'apply_progress_event' applies one progress event to the values of a progress record,
+    views and completions of a lesson other than the latest lesson reached change nothing
+    """
+    if progress_event["type"] == "content_opened":
+        progress["recent_content_name"] = progress_event["content_name"]
+    elif progress_event["LID"] != progress["latest_lesson_reached"]:
+        return
+    elif progress_event["type"] == "content_viewed":
+        if ordinal is not None and ordinal < VIEWED_BITMAP_SIZE:
+            progress["viewed_bitmap"] |= 1 << ordinal
+        else:
+            progress["viewed_contents"] = merge_viewed_contents(progress["viewed_contents"], [progress_event["content_name"]])
+    else:
+        progress.update(latest_lesson_reached=str(int(progress["latest_lesson_reached"])+1), viewed_contents="", viewed_bitmap=0)
+
+
+def apply_progress_events(events, retries=100):
+    """
+    'apply_progress_events' applies progress events in order and writes every progress record
+    they change in one transaction, with an UPDATE conditional on the version of each record.
+    It returns the progress records by key, or the key of a progress record that does not exist
+    """
+    table = Progress.__table__
+    keys = list(dict.fromkeys(progress_event["key"] for progress_event in events))
+    viewed = {(progress_event["LID"],) + progress_event["key"][1:] + (progress_event["content_name"],) for progress_event in events if progress_event["type"] == "content_viewed"}
+    ordinals = dict()
+    if viewed:
+        rows = db.session.query(Content.LID, Content.SID, Content.CID, Content.start, Content.content_name, Content.ordinal).filter(
+            tuple_(Content.LID, Content.SID, Content.CID, Content.start, Content.content_name).in_(viewed))
+        ordinals = {tuple(row[:5]): row[5] for row in rows}
+    for attempt in range(retries):
+        rows = db.session.query(*table.columns).filter(tuple_(table.c.EID, table.c.SID, table.c.CID, table.c.start).in_(keys))
+        read = {(row.EID, row.SID, row.CID, row.start): dict(row._mapping) for row in rows}
+        for key in keys:
+            if key not in read:
+                return None, key
+        progress = {key: dict(read[key]) for key in keys}
+        for progress_event in events:
+            ordinal = ordinals.get((progress_event.get("LID"),) + progress_event["key"][1:] + (progress_event.get("content_name"),))
+            apply_progress_event(progress[progress_event["key"]], progress_event, ordinal)
+        written = True
+        for key in keys:
+            if progress[key] == read[key]:
+                continue
+            values = {column: progress[key][column] for column in ("latest_lesson_reached", "recent_content_name", "viewed_contents", "viewed_bitmap")}
+            result = db.session.execute(table.update().where(and_(table.c.EID == key[0], table.c.SID == key[1], table.c.CID == key[2],
+                table.c.start == key[3], table.c.version == read[key]["version"])).values(version=table.c.version + 1, **values))
+            if result.rowcount == 0:
+                written = False
+                break
+            progress[key]["version"] += 1
+        if written:
+            db.session.commit()
+            return progress, None
+        db.session.rollback()
+    raise RuntimeError(f"Progress records {keys} are updated concurrently, retried {retries} times")
+### Progress Events ###
+
+### Grading Engine ###
+def quiz_key(LID, SID, CID, start):
+    """
+    'quiz_key' builds the cache key of a quiz
+    """
+    if isinstance(start, str):
+        start = datetime.fromisoformat(start)
+    return (str(LID), str(SID), str(CID), start)
+
+
+class Answer_key_cache():
+    """
+    'Answer_key_cache' keeps the answer key of the most recently used quizzes.
+    An answer key is a dictionary of question to (answer, options), loaded
+    with one query and stamped with the quiz_questions generation, it is
+    dropped once the questions of its quiz are committed by any worker
+    """
+    def __init__(self, generations, maxsize=256):
+        self.lock = RLock()
+        self.generations = generations
+        self.maxsize = maxsize
+        self.keys = OrderedDict()
+
+    def get(self, LID, SID, CID, start):
+        key = quiz_key(LID, SID, CID, start)
+        # the generation is read before the answer key is loaded, a write committed in between drops it again
+        generation = self.generations.current("quiz_questions")
+        with self.lock:
+            if key in self.keys:
+                stamp, answer_key = self.keys[key]
+                if self.generations.valid("quiz_questions", key, stamp):
+                    self.keys.move_to_end(key)
+                    return answer_key
+                del self.keys[key]
+        rows = db.session.query(Quiz_questions.question, Quiz_questions.answer, Quiz_questions.options).filter_by(
+            LID=key[0], SID=key[1], CID=key[2], start=key[3])
+        answer_key = {question: (answer, options) for question, answer, options in rows}
+        with self.lock:
+            if self.generations.valid("quiz_questions", key, generation):
+                self.keys[key] = (generation, answer_key)
+                while len(self.keys) > self.maxsize:
+                    self.keys.popitem(last=False)
+        return answer_key
+
+    def changed(self, keys):
+        """
+        'changed' drops the answer keys of quizzes whose questions this worker committed
+        """
+        keys = [quiz_key(*key) for key in keys]
+        with self.lock:
+            for key in keys:
+                self.keys.pop(key, None)
+        if keys:
+            self.generations.changed("quiz_questions", keys)
+
+    def invalidate(self):
+        with self.lock:
+            self.keys.clear()
+
+
+answer_keys = Answer_key_cache(shared_generations, app.config.get('ANSWER_KEY_CACHE_SIZE', 256))
+
+
+def grade(answer_key, question, answer_given):
+    """
+    'grade' returns the marks of an answer, 1 if it matches the answer key and 0 otherwise
+    """
+    if question in answer_key and answer_key[question][0] == answer_given:
+        return 1
+    return 0
+
+
+def grade_section(answer_key, rows):
+    """
+    'grade_section' grades rows of (EID, question, answer_given) against an answer key,
+    it returns the marks of each row and the (score, number of answers) of each engineer
+    """
+    if np is not None and rows:
+        given = np.array([row[2] for row in rows], dtype=object)
+        correct = np.array([answer_key.get(row[1], (None,))[0] for row in rows], dtype=object)
+        marks = (given == correct).astype(np.int64)
+        engineers, index = np.unique(np.array([row[0] for row in rows], dtype=np.int64), return_inverse=True)
+        scores = np.bincount(index, weights=marks, minlength=len(engineers)).astype(np.int64)
+        totals = np.bincount(index, minlength=len(engineers))
+        return marks.tolist(), dict(zip(engineers.tolist(), zip(scores.tolist(), totals.tolist())))
+    marks = [grade(answer_key, question, answer_given) for EID, question, answer_given in rows]
+    results = dict()
+    for row, mark in zip(rows, marks):
+        score, total = results.get(row[0], (0, 0))
+        results[row[0]] = (score + mark, total + 1)
+    return marks, results
+### Grading Engine ###
+
+### Eligibility Engine ###
+def is_eligible(CID, prerequisites, completed_courses, ongoing_courses):
+    """
+    'is_eligible' checks if an engineer can take a course. A course is eligible
+    when it is neither completed nor ongoing and every prerequisite is completed,
+    an ongoing prerequisite does not count. It decides both the eligible courses
+    of an engineer and the qualified learners of a course. completed_courses and
+    ongoing_courses are sets of CID
+    """
+    if CID in completed_courses or CID in ongoing_courses:
+        return False
+    for prereq in prerequisites:
+        if prereq not in completed_courses:
+            return False
+    return True
+
+
+class Eligibility_store():
+    """
+    'Eligibility_store' materializes the completed and ongoing courses of every
+    engineer, and the courses each engineer is eligible for, in memory.
+    Engineers are loaded on first use, stamped with the academic_record
+    generation, and refreshed one at a time whenever their academic records
+    are committed. Everything is reloaded once another worker commits
+    """
+    def __init__(self, generations):
+        self.lock = RLock()
+        self.generations = generations
+        self.generation = None
+        self.invalidate()
+
+    def invalidate(self):
+        with self.lock:
+            self.records = {}
+            self.stamps = {}
+            self.eligible = {}
+            self.engineers = []
+            self.all_loaded = False
+            self.dirty = set()
+            self.generation = None
+            self.version = getattr(self, "version", 0) + 1
+            # the engineers invalidated by each version since, for Eligibility_matrix to update their rows only
+            self.changes = deque(maxlen=1024)
+
+    def invalidate_engineers(self, EIDs):
+        with self.lock:
+            EIDs = frozenset(int(EID) for EID in EIDs)
+            for EID in EIDs:
+                self.records.pop(EID, None)
+                self.eligible.pop(EID, None)
+                if self.all_loaded:
+                    self.dirty.add(EID)
+            self.version += 1
+            self.changes.append((self.version, EIDs))
+
+    def changed_since(self, version):
+        """
+        'changed_since' returns the engineers invalidated after a version of the store,
+        or None when everything was invalidated since or the changes are no longer kept
+        """
+        with self.lock:
+            if version == self.version:
+                return set()
+            if not self.changes or self.changes[0][0] > version + 1:
+                return None
+            return set().union(*(EIDs for changed, EIDs in self.changes if changed > version))
+
+    def changed(self, EIDs):
+        """
+        'changed' refreshes the engineers whose academic records this worker committed
+        """
+        EIDs = [int(EID) for EID in EIDs]
+        if EIDs:
+            self.invalidate_engineers(EIDs)
+            self.generations.changed("academic_record", EIDs)
+
+    def sync(self):
+        """
+        'sync' returns the generation to stamp the engineers loaded from now on with,
+        every engineer is dropped when another worker committed academic records
+        """
+        generation = self.generations.current("academic_record")
+        with self.lock:
+            if self.generation is None or not self.generations.valid("academic_record", None, self.generation):
+                self.invalidate()
+                self.generation = generation
+        return generation
+
+    def fresh(self, EID):
+        return EID in self.records and self.generations.valid("academic_record", EID, self.stamps[EID])
+
+    def load(self, EIDs):
+        """
+        'load' fetches the academic records of the engineers that are not
+        materialized yet, grouped in a single query
+        """
+        generation = self.sync()
+        with self.lock:
+            missing = [EID for EID in set(int(EID) for EID in EIDs) if not self.fresh(EID)]
+            if missing:
+                rows = db.session.query(Academic_record.EID, Academic_record.CID, Academic_record.status).filter(
+                    Academic_record.EID.in_(missing),
+                    Academic_record.status.in_(["completed", "ongoing"])
+                ).all()
+                for EID in missing:
+                    self.records[EID] = (set(), set())
+                    self.stamps[EID] = generation
+                    self.eligible.pop(EID, None)
+                self.add_rows(rows)
+
+    def load_all(self):
+        """
+        'load_all' materializes every engineer in a single query, or only the
+        engineers changed since the last load
+        """
+        generation = self.sync()
+        with self.lock:
+            if self.all_loaded and not self.dirty:
+                return
+            query = db.session.query(Engineer.EID, Academic_record.CID, Academic_record.status).outerjoin(
+                Academic_record,
+                and_(Academic_record.EID == Engineer.EID,
+                     Academic_record.status.in_(["completed", "ongoing"]))
+            )
+            if self.all_loaded:
+                query = query.filter(Engineer.EID.in_(self.dirty))
+                engineers = set(self.engineers) - self.dirty
+            else:
+                engineers = set()
+            rows = query.all()
+            for EID, CID, status in rows:
+                engineers.add(EID)
+                self.records[EID] = (set(), set())
+                self.stamps[EID] = generation
+            self.add_rows(rows)
+            self.engineers = sorted(engineers)
+            self.all_loaded = True
+            self.dirty = set()
+
+    def add_rows(self, rows):
+        for EID, CID, status in rows:
+            completed_courses, ongoing_courses = self.records[EID]
+            if status == "completed":
+                completed_courses.add(CID)
+            elif status == "ongoing":
+                ongoing_courses.add(CID)
+
+    def courses_of(self, EID):
+        """
+        'courses_of' returns the sets of completed and ongoing CID of an engineer
+        """
+        EID = int(EID)
+        self.sync()
+        with self.lock:
+            if not self.fresh(EID):
+                self.load([EID])
+            return self.records[EID]
+
+    def eligible_courses(self, EID):
+        """
+        'eligible_courses' returns the set of CID an engineer is eligible for
+        """
+        EID = int(EID)
+        graph = prerequisite_graph.refresh()
+        with self.lock:
+            completed_courses, ongoing_courses = self.courses_of(EID)
+            version, eligible = self.eligible.get(EID, (None, None))
+            if version != graph.version:
+                eligible = frozenset(CID for CID, prerequisites in graph.prerequisites.items()
+                                     if is_eligible(CID, prerequisites, completed_courses, ongoing_courses))
+                self.eligible[EID] = (graph.version, eligible)
+            return eligible
+
+    def classify(self, CID):
+        """
+        'classify' buckets every engineer into ongoing, completed, eligible and
+        ineligible for a course
+        """
+        prerequisites = prerequisite_graph.prerequisites_of(CID)
+        result = {'ongoing' : [], 'completed' : [], 'ineligible' : [], 'eligible' : []}
+        with self.lock:
+            self.load_all()
+            for EID in self.engineers:
+                completed_courses, ongoing_courses = self.records[EID]
+                if CID in completed_courses:
+                    result['completed'].append(EID)
+                elif CID in ongoing_courses:
+                    result['ongoing'].append(EID)
+                elif is_eligible(CID, prerequisites, completed_courses, ongoing_courses):
+                    result['eligible'].append(EID)
+                else:
+                    result['ineligible'].append(EID)
         return result
 
-    def json(self):
-        return {"EID": self.EID, "LID": self.LID, "SID": self.SID, "CID": self.CID, "start": self.start , "question": self.question,
-                "answer_given":self.answer_given, "marks": self.marks}
-### Quiz record Class ###
+
+eligibility_store = Eligibility_store(shared_generations)
+
+
+class Eligibility_matrix():
+    """
+    'Eligibility_matrix' keeps the materialized records as packed bitsets, one
+    row per EID and one bit per CID in uint64 words, so that every engineer is
+    checked against a course's prerequisite mask with a single vectorized
+    comparison. When only academic records changed, the rows of the changed
+    engineers are repacked in place. Only available when numpy is installed
+    """
+    def __init__(self):
+        self.lock = RLock()
+        self.versions = None
+
+    def enabled(self):
+        return np is not None
+
+    def refresh(self):
+        graph = prerequisite_graph.refresh()
+        with eligibility_store.lock:
+            eligibility_store.load_all()
+            versions = (graph.version, eligibility_store.version)
+            if versions == self.versions:
+                return self
+            with self.lock:
+                EIDs = None
+                if self.versions is not None and self.versions[0] == graph.version:
+                    EIDs = eligibility_store.changed_since(self.versions[1])
+                if EIDs is None or not self.update(eligibility_store, EIDs):
+                    self.build(graph, eligibility_store)
+                self.versions = versions
+        return self
+
+    def build(self, graph, store):
+        columns = list(graph.courses)
+        for prerequisites in graph.prerequisites.values():
+            columns.extend(prereq for prereq in prerequisites if prereq not in graph.courses)
+        self.courses = list(graph.courses)
+        self.columns = {CID: column for column, CID in enumerate(dict.fromkeys(columns))}
+        self.engineers = np.array(store.engineers, dtype=np.int64)
+        words = (len(self.columns) + 63) // 64
+        self.completed = self.pack(store, 0, words)
+        self.ongoing = self.pack(store, 1, words)
+        self.masks = {}
+        for CID in self.courses:
+            self.masks[CID] = self.pack_mask([self.columns[prereq] for prereq in graph.prerequisites[CID]], words)
+
+    def update(self, store, EIDs):
+        """
+        'update' repacks the rows of the engineers whose records changed, returns
+        False when an engineer was added or removed and the matrix must be built again
+        """
+        if len(store.engineers) != len(self.engineers):
+            return False
+        EIDs = np.array(sorted(EIDs), dtype=np.int64)
+        rows = np.searchsorted(self.engineers, EIDs)
+        present = rows < len(self.engineers)
+        present[present] = self.engineers[rows[present]] == EIDs[present]
+        if not present.all():
+            return False
+        for bits, status in ((self.completed, 0), (self.ongoing, 1)):
+            bits[rows, :] = 0
+            self.set_bits(bits, store, status, rows, EIDs.tolist())
+        return True
+
+    def pack(self, store, status, words):
+        # column major keeps each word of every engineer contiguous
+        bits = np.zeros((len(store.engineers), words), dtype=np.uint64, order='F')
+        self.set_bits(bits, store, status, range(len(store.engineers)), store.engineers)
+        return bits
+
+    def set_bits(self, bits, store, status, rows, EIDs):
+        """
+        'set_bits' sets the bits of the courses each engineer has in a status on their row
+        """
+        hits = []
+        columns = []
+        for row, EID in zip(rows, EIDs):
+            for CID in store.records[EID][status]:
+                if CID in self.columns:
+                    hits.append(row)
+                    columns.append(self.columns[CID])
+        hits = np.array(hits, dtype=np.int64)
+        columns = np.array(columns, dtype=np.uint64)
+        np.bitwise_or.at(bits, (hits, (columns >> np.uint64(6)).astype(np.int64)), np.left_shift(np.uint64(1), columns & np.uint64(63)))
+
+    def pack_mask(self, columns, words):
+        """
+        'pack_mask' returns the non-empty words of a prerequisite mask as (word, bits) pairs
+        """
+        mask = np.zeros(words, dtype=np.uint64)
+        for column in columns:
+            mask[column >> 6] |= np.uint64(1) << np.uint64(column & 63)
+        return [(word, mask[word]) for word in mask.nonzero()[0]]
+
+    def has(self, bits, CID):
+        column = self.columns[CID]
+        return (bits[:, column >> 6] >> np.uint64(column & 63)) & np.uint64(1) == np.uint64(1)
+
+    def eligible_for(self, CID):
+        """
+        'eligible_for' returns a boolean array over the engineers, true when the
+        engineer is eligible for the course
+        """
+        eligible = ~self.has(self.completed, CID) & ~self.has(self.ongoing, CID)
+        for word, bits in self.masks[CID]:
+            eligible &= (self.completed[:, word] & bits) == bits
+        return eligible
+
+    def classify(self, CID):
+        """
+        'classify' buckets every engineer into ongoing, completed, eligible and
+        ineligible for a course
+        """
+        with self.refresh().lock:
+            completed = self.has(self.completed, CID)
+            ongoing = ~completed & self.has(self.ongoing, CID)
+            eligible = self.eligible_for(CID)
+            ineligible = ~(completed | ongoing | eligible)
+            return {
+                'ongoing' : self.engineers[ongoing].tolist(),
+                'completed' : self.engineers[completed].tolist(),
+                'ineligible' : self.engineers[ineligible].tolist(),
+                'eligible' : self.engineers[eligible].tolist()
+            }
+
+    def eligible_matrix(self):
+        """
+        'eligible_matrix' returns the engineers, the courses and a boolean
+        matrix of engineers by courses
+        """
+        with self.refresh().lock:
+            matrix = np.zeros((len(self.engineers), len(self.courses)), dtype=bool)
+            for column, CID in enumerate(self.courses):
+                matrix[:, column] = self.eligible_for(CID)
+            return self.engineers.tolist(), self.courses, matrix
+
+
+eligibility_matrix = Eligibility_matrix()
+
+
+def classify_engineers(CID):
+    """
+    'classify_engineers' classifies every engineer for a course, using the
+    bitset matrix when numpy is available
+    """
+    if eligibility_matrix.enabled():
+        return eligibility_matrix.classify(CID)
+    return eligibility_store.classify(CID)
+### Eligibility Engine ###
 
 ### Start of API points for Course CRUD ###
 @app.route("/view_courses", methods=['GET'])
 #view all courses
 def view_all_courses():
-    retrieved_courses = Course.query.all()
-    courses = [course.to_dict() for course in retrieved_courses]
+    try:
+        #a page is read from the table in primary key order, the whole catalog is served from the cache
+        if "limit" in request.args:
+            courses, page = read_page(Course.query, Course)
+        else:
+            courses, page = course_catalog.all(), {}
+    except ValueError:
+        return jsonify(
+            {
+                "message": "limit or after is invalid"
+            }
+        ), 500
     if courses:
         return jsonify(
             {
                 "message": "All courses are retrieved",
-                "data": courses
+                "data": courses,
+                **page
             }
         ), 200
     return jsonify(
@@ -455,10 +2055,6 @@ def view_all_courses():
 @app.route("/view_eligible_courses", methods=['POST'])
 def view_eligible_courses():
     data = request.get_json()
-    completed_courses = []
-    eligible_courses = []
-    non_eligible_courses = []
-    all_courses = {}
     final_result = {"eligible":[],"non_eligible":[]}
 
     if "EID" not in data.keys():
@@ -469,38 +2065,15 @@ def view_eligible_courses():
         ), 500
 
     try:
-        #retrieve all completed course, ongoing course by EID
-        completed_courses_retrieved = Academic_record.query.filter_by(EID=data["EID"], status="completed")
-        ongoing_courses_retrieved = Academic_record.query.filter_by(EID=data["EID"], status="ongoing")
-        completed_courses = [course.to_dict() for course in completed_courses_retrieved]
-        ongoing_courses = [course.to_dict() for course in ongoing_courses_retrieved]
-
-        all_courses_retrieved = Course.query.all()
-
-        for course in all_courses_retrieved:
-            all_courses[course.json()['CID']] = course.list_of_prerequisites()
-
-        # If course is not in completed courses and on-going courses and fulfil the re-requisite, it is eligible
-        # If course is either on-going or completed, it is not eligible
-        for course, prerequisites in all_courses.items():
-            if course not in [c_course["CID"] for c_course in completed_courses] and course not in [o_course["CID"] for o_course in ongoing_courses]:
-                status = True
-                for prereq in prerequisites:
-                    if prereq not in [c_course["CID"] for c_course in completed_courses] and course not in [o_course["CID"] for o_course in ongoing_courses]:
-                        status = False
-                if status == True:
-                    eligible_courses.append(course)
-
-
-        for course in all_courses:
-            if course not in eligible_courses:
-                non_eligible_courses.append(course)
-        
-        for course in all_courses_retrieved:
-            if course.json()['CID'] in eligible_courses:
-                final_result['eligible'].append(course.json())
+        #read the catalog and the engineer's materialized eligibility
+        courses = course_catalog.refresh().courses
+        eligible_courses = eligibility_store.eligible_courses(data["EID"])
+
+        for CID, course in courses.items():
+            if CID in eligible_courses:
+                final_result['eligible'].append(course)
             else:
-                final_result['non_eligible'].append(course.json())
+                final_result['non_eligible'].append(course)
 
         if final_result['eligible'] or final_result['non_eligible']:
             return jsonify(
@@ -525,6 +2098,51 @@ def view_eligible_courses():
 
 
 
+#view eligible courses for many EID at once, streamed back as one JSON object per line
+@app.route("/view_eligible_courses_bulk", methods=['POST'])
+def view_eligible_courses_bulk():
+    data = request.get_json()
+    if "EIDs" not in data.keys():
+        return jsonify(
+            {
+                "message": "EIDs is missing"
+            }
+        ), 500
+
+    try:
+        courses = course_catalog.refresh().courses
+        if "CIDs" in data.keys():
+            courses = {CID: course for CID, course in courses.items() if CID in data["CIDs"]}
+        if not courses:
+            return jsonify(
+                {
+                    "message": "There are no course retrieved"
+                }
+            ), 500
+
+        #load the academic records of every requested engineer in one query
+        eligibility_store.load(data["EIDs"])
+
+        def generate():
+            for EID in data["EIDs"]:
+                eligible_courses = eligibility_store.eligible_courses(EID)
+                result = {"EID": EID, "eligible": [], "non_eligible": []}
+                for CID, course in courses.items():
+                    if CID in eligible_courses:
+                        result['eligible'].append(course)
+                    else:
+                        result['non_eligible'].append(course)
+                yield json.dumps(result) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson"), 200
+
+    except Exception as e:
+        return jsonify(
+            {
+                "message": "There are no course retrieved"
+            }
+        ), 500
+
+
 #view qualified EID by CID
 @app.route("/view_qualified_learner", methods=['POST'])
 def view_qualified_learner():
@@ -537,40 +2155,9 @@ def view_qualified_learner():
         ), 500
 
     try:
-        exist = Course.query.filter_by(CID=data['CID']).first()!= None
-        if exist:
-            selected_course = Course.query.filter_by(CID=data['CID']).first()
-            prerequisites_list = selected_course.list_of_prerequisites()
-            eligible = list()
-            ineligible = list()
-            ongoing = list()
-            completed = list()
-
-            #retrieve all completed course, ongoing course by EID
-            all_EID_retrieved = Engineer.query.all()
-            all_EID = [engineer.to_dict() for engineer in all_EID_retrieved]
-
-            for dude in all_EID:
-                can_take=True
-                completed_courses_retrieved = Academic_record.query.filter_by(EID=dude["EID"], status="completed")
-                ongoing_courses_retrieved = Academic_record.query.filter_by(EID=dude["EID"], status="ongoing")
-                completed_courses = [course.to_dict() for course in completed_courses_retrieved]
-                completed_courses_list = [course['CID'] for course in completed_courses]
-                ongoing_courses = [ongoing_course.to_dict() for ongoing_course in ongoing_courses_retrieved]
-                ongoing_courses_list = [ongoing_courses['CID']  for ongoing_courses in ongoing_courses]
-                for CID in prerequisites_list:
-                    if (CID not in completed_courses) and (CID not in ongoing_courses):
-                        can_take=False
-                if data['CID'] in completed_courses_list:
-                    completed.append(dude['EID'])
-                elif data['CID'] in ongoing_courses_list:
-                    ongoing.append(dude['EID'])
-                elif can_take:
-                    eligible.append(dude['EID'])
-                else:
-                    ineligible.append(dude['EID'])
-            result = {'ongoing' : ongoing, 'completed' : completed, 'ineligible' : ineligible, 'eligible' : eligible}
-
+        if data['CID'] in prerequisite_graph:
+            #read the classification from the materialized records of every engineer
+            result = classify_engineers(data['CID'])
             return jsonify(
                 {       "message": f"Engineer is classified according to course {data['CID']}",
                         "data": result
@@ -590,6 +2177,42 @@ def view_qualified_learner():
         ), 500
 
 
+#view eligible courses of every engineer
+@app.route("/view_eligibility_matrix", methods=['GET'])
+def view_eligibility_matrix():
+    try:
+        if eligibility_matrix.enabled():
+            engineers, courses, matrix = eligibility_matrix.eligible_matrix()
+            result = [{"EID": EID, "eligible": [courses[column] for column in row.nonzero()[0]]}
+                      for EID, row in zip(engineers, matrix)]
+        else:
+            eligibility_store.load_all()
+            courses = list(course_catalog.refresh().courses)
+            result = []
+            for EID in eligibility_store.engineers:
+                eligible_courses = eligibility_store.eligible_courses(EID)
+                result.append({"EID": EID, "eligible": [CID for CID in courses if CID in eligible_courses]})
+
+        if result:
+            return jsonify(
+                {
+                    "message": "Eligible courses of all engineers are retrieved",
+                    "data": result
+                }
+            ), 200
+        return jsonify(
+            {
+                "message": "There are no engineer retrieved"
+            }
+        ), 500
+    except Exception as e:
+        return jsonify(
+            {
+                "message": f"There are no engineer retrieved due to {e}"
+            }
+        ), 500
+
+
 #view on-going and completed courses by EID
 @app.route("/view_enrollment_by_EID", methods=['POST'])
 def view_enrollment_by_EID():
@@ -602,12 +2225,8 @@ def view_enrollment_by_EID():
     ), 500
 
     try:
-        enrolled_sections = Enrollment.query.filter_by(EID=data["EID"])
-        sections = [section.to_dict() for section in enrolled_sections]
+        sections = select_related(Enrollment.query.filter_by(EID=data["EID"]), Enrollment, "course")
         if sections:
-            for enrolled_section in sections:
-                course_detail = Course.query.filter_by(CID=enrolled_section["CID"]).first()
-                enrolled_section['course_name'] = course_detail.to_dict()['name']
             return jsonify(
                 {
                     "message": "All enrolled sections are retrieved",
@@ -643,8 +2262,8 @@ def view_current_completed_courses():
     try:
         completed_courses_retrieved = Academic_record.query.filter_by(EID=data["EID"], status="completed")
         ongoing_courses_retrieved = Academic_record.query.filter_by(EID=data["EID"], status="ongoing")
-        completed_courses = [course.to_dict() for course in completed_courses_retrieved]
-        ongoing_courses = [course.to_dict() for course in ongoing_courses_retrieved]
+        completed_courses = select_rows(completed_courses_retrieved, Academic_record)
+        ongoing_courses = select_rows(ongoing_courses_retrieved, Academic_record)
 
         if len(completed_courses) == 0 and len(ongoing_courses)==0:
             return jsonify(
@@ -679,6 +2298,12 @@ def create_course():
         }
     ), 500
     try:
+        if prerequisite_graph.creates_cycle(data["CID"], data["prerequisites"]):
+            return jsonify(
+            {
+                "message": f"{data['name']} prerequisites create a cycle, course is not inserted successfully into the database",
+            }
+        ), 500
         course = Course(CID=data["CID"], name=data["name"], prerequisites=data["prerequisites"])
         db.session.add(course)
         db.session.commit()
@@ -708,11 +2333,17 @@ def query_course():
         }
     ), 500
     try:
-        course = Course.query.filter_by(CID=data["CID"]).first()
+        course = course_catalog.get(data["CID"])
+        if course is None:
+            return jsonify(
+            {
+                "message": f"{data['CID']} cannot be query",
+            }
+        ), 500
         return jsonify(
         {
             "message": f"{data['CID']} has been query successfully from the database",
-            "data": course.to_dict()
+            "data": course
         }
     ), 200
     except Exception as e:
@@ -734,10 +2365,15 @@ def update_course_name():
         }
         ), 500
     try:
-        course = Course.query.filter_by(CID=data["CID"])
-        course.update(dict(name=data['name']))
-        course = Course.query.filter_by(CID=data["CID"]).first()
+        if write_rows(Course.query.filter_by(CID=data["CID"]), dict(name=data['name'])) == 0:
+            db.session.rollback()
+            return jsonify(
+            {
+                "message": f"{data['CID']} name is not updated"
+            }
+        ), 500
         db.session.commit()
+        course = Course.query.filter_by(CID=data["CID"]).first()
         return jsonify(
         {
             "message": f"{data['CID']} name has been updated successfully in the database",
@@ -762,10 +2398,21 @@ def update_course_prerequisites():
         }
         ), 500
     try:
-        course = Course.query.filter_by(CID=data["CID"])
-        course.update(dict(prerequisites=data['prerequisites']))
-        course = Course.query.filter_by(CID=data["CID"]).first()
+        if prerequisite_graph.creates_cycle(data["CID"], data["prerequisites"]):
+            return jsonify(
+            {
+                "message": f"{data['CID']} prerequisites create a cycle, prerequisites is not updated"
+            }
+        ), 500
+        if write_rows(Course.query.filter_by(CID=data["CID"]), dict(prerequisites=data['prerequisites'])) == 0:
+            db.session.rollback()
+            return jsonify(
+            {
+                "message": f"{data['CID']} prerequisites is not updated"
+            }
+        ), 500
         db.session.commit()
+        course = Course.query.filter_by(CID=data["CID"]).first()
         return jsonify(
         {
             "message": f"{data['CID']} prerequisites has been updated successfully in the database",
@@ -791,19 +2438,8 @@ def delete_course():
         }
         ), 500
     try:
-        course = Course.query.filter_by(CID=data["CID"])
-        if course.first()==None:
-            return jsonify(
-            {
-                "message": f"{data['CID']} is not deleted"
-            }),500
-        course.delete()
-        db.session.commit()
-        return jsonify(
-        {
-            "message": f"{data['CID']} has been deleted successfully from the database"
-        }
-        ), 200
+        count = write_rows(Course.query.filter_by(CID=data["CID"]))
+        return write_response(count, f"{data['CID']} has been deleted successfully from the database", f"{data['CID']} is not deleted")
     except Exception as e:
         return jsonify(
         {
@@ -863,46 +2499,263 @@ def engineer_withdraw():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     try:
-        exist = (Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).first() != None)
-        if exist :
-            Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).delete()
+        if write_rows(Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start'])) > 0:
             db.session.commit()
             return jsonify(
             {
                 "message": f"{data['EID']} has been deleted successfully from Enrollment"
             }
-            ), 200
-        else:
-            return jsonify(
-                {
-                    "message": f"Enrollment {data['EID']} is not present in database, engineer is not withdraw",
-                }), 500
+            ), 200
+        count = write_rows(Waitlist.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']))
+        return write_response(count, f"{data['EID']} has been deleted successfully from Waitlist",
+                              f"Enrollment {data['EID']} is not present in database, engineer is not withdraw")
+    except Exception as e:
+        return jsonify(
+        {
+            "message": f"{data['EID']} is not withdraw"
+        }
+    ), 500
+
+@app.route("/hr_view_signup", methods=['GET'])
+def hr_view_signup():
+    if wants_stream():
+        return stream_rows(Enrollment.query, Enrollment, "All enrollments are retrieved", "There are no enrollment retrieved")
+    try:
+        enrolls, page = read_page(Enrollment.query, Enrollment)
+    except ValueError:
+        return jsonify(
+            {
+                "message": "limit or after is invalid"
+            }
+        ), 500
+    if enrolls:
+        return jsonify(
+            {
+                "message": "All enrollments are retrieved",
+                "data": enrolls,
+                **page
+            }
+        ), 200
+    return jsonify(
+        {
+            "message": "There are no enrollment retrieved"
+        }
+    ), 500
+
+
+
+@app.route("/hr_view_waitlist", methods=['POST'])
+def hr_view_waitlist():
+    data = request.get_json()
+    expected=["CID", "SID", "start"]
+    not_present=list()
+    #check input
+    for expect in expected:
+        if expect not in data.keys():
+            not_present.append(expect)
+    if len(not_present)>0:
+        return jsonify(
+            {
+                "message": f"Waitlist {not_present} is not present, waitlist is not retrieved"
+            }
+        ), 500
+    data["start"] = datetime.fromisoformat(data["start"])
+    waitlist = select_rows(Waitlist.query.filter_by(SID = data['SID'], CID = data['CID'], start = data['start']).order_by(Waitlist.id), Waitlist)
+    if waitlist:
+        return jsonify(
+            {
+                "message": f"Waitlist of section {data['SID'], data['CID']} is retrieved",
+                "data": waitlist
+            }
+        ), 200
+    return jsonify(
+        {
+            "message": f"There are no engineer waiting for section {data['SID'], data['CID']}"
+        }
+    ), 500
+
+
+@app.route("/hr_assign_engineer_bulk", methods=['POST'])
+def hr_assign_engineer_bulk():
+    data = request.get_json()
+    if "records" not in data.keys():
+        return jsonify(
+            {
+                "message": "records is missing, engineers are not assigned"
+            }
+        ), 500
+    try:
+        keys, results = read_bulk_records(data)
+        assigned = record_keys(Academic_record, keys)
+        sections = record_keys_of_sections(keys)
+        granted = set()
+        for index, key in enumerate(keys):
+            if key == None:
+                continue
+            if key in assigned:
+                results[index].update(success=False, message=f"{key[0]} is already assigned, engineer is not assigned")
+            elif key[1:] not in sections:
+                results[index].update(success=False, message=f"Section {key[1], key[2]} does not exist, engineer is not assigned")
+            else:
+                granted.add(key)
+        seats = {section: reserve_seats(*section, len(section_keys)) for section, section_keys in group_by_section(granted).items()}
+        inserted = list()
+        for index, key in enumerate(keys):
+            if key in granted:
+                if seats[key[1:]] > 0:
+                    seats[key[1:]] -= 1
+                    inserted.append(key)
+                    results[index]["message"] = f"{key[0]} has been inserted successfully into the course details"
+                else:
+                    results[index].update(success=False, message=f"Section {key[1], key[2]} has no vacancy, engineer is not assigned")
+        insert_record_keys(Academic_record, inserted, status="ongoing")
+        mark_engineers_changed(db.session, [key[0] for key in inserted])
+        db.session.commit()
+        return bulk_response(results, "assigned")
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(
+        {
+            "message": f"Engineers are not assigned, {e}",
+        }
+    ), 500
+
+
+@app.route("/hr_withdraw_engineer_bulk", methods=['POST'])
+def hr_withdraw_engineer_bulk():
+    data = request.get_json()
+    if "records" not in data.keys():
+        return jsonify(
+            {
+                "message": "records is missing, engineers are not withdrawn"
+            }
+        ), 500
+    try:
+        keys, results = read_bulk_records(data)
+        assigned = record_keys(Academic_record, keys)
+        #only ongoing records hold a seat of their section
+        ongoing = record_keys(Academic_record, keys, status="ongoing")
+        withdrawn = list()
+        for index, key in enumerate(keys):
+            if key == None:
+                continue
+            if key in assigned:
+                withdrawn.append(key)
+                results[index]["message"] = f"{key[0]} has been deleted successfully from course details"
+            else:
+                results[index].update(success=False, message=f"academic_record {key[0]} is not present in database, engineer is not withdrawn")
+        delete_record_keys(Academic_record, withdrawn)
+        for section, section_keys in group_by_section([key for key in withdrawn if key in ongoing]).items():
+            free_seats(*section, len(section_keys))
+        mark_engineers_changed(db.session, [key[0] for key in withdrawn])
+        db.session.commit()
+        return bulk_response(results, "withdrawn")
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(
+        {
+            "message": f"Engineers are not withdrawn, {e}",
+        }
+    ), 500
+
+
+@app.route("/hr_approve_signup_bulk", methods=['POST'])
+def hr_approve_signup_bulk():
+    data = request.get_json()
+    if "records" not in data.keys():
+        return jsonify(
+            {
+                "message": "records is missing, engineers are not enrolled"
+            }
+        ), 500
+    try:
+        keys, results = read_bulk_records(data)
+        signups = record_keys(Enrollment, keys)
+        sections = record_keys_of_sections(keys)
+        approved = set()
+        for index, key in enumerate(keys):
+            if key == None:
+                continue
+            if key not in signups:
+                results[index].update(success=False, message=f"Academic record {key[0]} is not present, engineer is not enrolled")
+            elif key[1:] not in sections:
+                results[index].update(success=False, message=f"Section {key[1], key[2]} does not exist, engineer is not enrolled")
+            else:
+                approved.add(key)
+        #engineers already enrolled or waiting keep their place
+        taken = record_keys(Academic_record, approved) | record_keys(Waitlist, approved)
+        approved -= taken
+        for index, key in enumerate(keys):
+            if key in taken:
+                results[index].update(success=False, message=f"{key[0]} is already enrolled or waitlisted, engineer is not enrolled")
+        #a section with engineers waiting gives no seat to new approvals
+        seats = {section: 0 if waitlist_waiting(*section) else reserve_seats(*section, len(section_keys))
+                 for section, section_keys in group_by_section(approved).items()}
+        enrolled = list()
+        waitlisted = list()
+        for index, key in enumerate(keys):
+            if key in approved:
+                if seats[key[1:]] > 0:
+                    seats[key[1:]] -= 1
+                    enrolled.append(key)
+                    results[index]["message"] = f"{key[0]} prerequisites has been moved successfully from Enrollment to academic_record"
+                else:
+                    waitlisted.append(key)
+                    results[index]["message"] = f"Section {key[1], key[2]} has no vacancy, {key[0]} has been added to the waitlist"
+        delete_record_keys(Enrollment, list(approved))
+        insert_record_keys(Academic_record, enrolled, status="ongoing")
+        insert_record_keys(Waitlist, waitlisted)
+        #vacancy left while engineers were waiting goes to the head of the waitlist
+        for section in group_by_section(waitlisted):
+            promoted = fill_from_waitlist(*section)
+            for index, key in enumerate(keys):
+                if key in waitlisted and key[1:] == section and key[0] in promoted:
+                    results[index]["message"] = f"{key[0]} prerequisites has been moved successfully from Enrollment to academic_record"
+        mark_engineers_changed(db.session, [key[0] for key in enrolled])
+        db.session.commit()
+        return bulk_response(results, "approved")
     except Exception as e:
+        db.session.rollback()
         return jsonify(
         {
-            "message": f"{data['EID']} is not withdraw"
+            "message": f"Engineers are not enrolled, {e}",
         }
     ), 500
 
-@app.route("/hr_view_signup", methods=['GET'])
-def hr_view_signup():
-    retrieved_signups = Enrollment.query.all()
-    enrolls = [enroll.to_dict() for enroll in retrieved_signups]
-    if enrolls:
+
+@app.route("/hr_reject_signup_bulk", methods=['POST'])
+def hr_reject_signup_bulk():
+    data = request.get_json()
+    if "records" not in data.keys():
         return jsonify(
             {
-                "message": "All enrollments are retrieved",
-                "data": enrolls
+                "message": "records is missing, signups are not rejected"
             }
-        ), 200
-    return jsonify(
+        ), 500
+    try:
+        keys, results = read_bulk_records(data)
+        signups = record_keys(Enrollment, keys)
+        rejected = list()
+        for index, key in enumerate(keys):
+            if key == None:
+                continue
+            if key in signups:
+                rejected.append(key)
+                results[index]["message"] = f"{key[0]} has been deleted successfully from Enrollment"
+            else:
+                results[index].update(success=False, message=f"Enrollment {key[0]} is not present in database,  engineer is not rejected")
+        delete_record_keys(Enrollment, rejected)
+        db.session.commit()
+        return bulk_response(results, "rejected")
+    except Exception as e:
+        db.session.rollback()
+        return jsonify(
         {
-            "message": "There are no enrollment retrieved"
+            "message": f"Signups are not rejected, {e}",
         }
     ), 500
 
 
-
 @app.route("/hr_assign_engineer", methods=['POST'])
 def hr_assign_engineer():
     data = request.get_json()
@@ -922,6 +2775,14 @@ def hr_assign_engineer():
     try:
         academic_record = Academic_record(EID = data["EID"], SID = data["SID"], CID = data["CID"], start = data["start"], status = "ongoing")
         db.session.add(academic_record)
+        db.session.flush()
+        if not reserve_seat(data["SID"], data["CID"], data["start"]):
+            db.session.rollback()
+            return jsonify(
+                {
+                    "message": no_seat_message(data["SID"], data["CID"], data["start"], "engineer is not assigned")
+                }
+            ), 500
         db.session.commit()
 
         return jsonify(
@@ -955,20 +2816,16 @@ def hr_withdraw_engineer():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     try:
-        exist = (Academic_record.query.filter_by(EID = data["EID"], SID = data["SID"], CID = data["CID"], start = data["start"]).first() != None)
-        if exist:
-            Academic_record.query.filter_by(EID = data["EID"], SID = data["SID"], CID = data["CID"], start = data["start"]).delete()
-            db.session.commit()
-            return jsonify(
-                {
-                    "message": f"{data['EID']} has been deleted successfully from course details",
-                }
-            ), 200
-        else:
-            return jsonify(
-                {
-                    "message": f"academic_record {data['EID']} is not present in database, engineer is not withdrawn",
-                }), 500
+        academic_record = Academic_record.query.filter_by(EID = data["EID"], SID = data["SID"], CID = data["CID"], start = data["start"])
+        #only an ongoing record holds a seat of the section
+        ongoing = write_rows(academic_record.filter_by(status = "ongoing"))
+        count = ongoing + write_rows(academic_record)
+        if ongoing > 0:
+            free_seats(data["SID"], data["CID"], data["start"])
+        if count > 0:
+            mark_engineers_changed(db.session, [data["EID"]])
+        return write_response(count, f"{data['EID']} has been deleted successfully from course details",
+                              f"academic_record {data['EID']} is not present in database, engineer is not withdrawn")
     except Exception as e:
         return jsonify(
         {
@@ -994,12 +2851,44 @@ def hr_approve_signup():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     try:
-        exist = (Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start= data['start']).first() != None)
-        if exist:
-            academic_record = Academic_record(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start'], status = "ongoing")
-            Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).delete()
-            db.session.add(academic_record)
-            db.session.commit()
+        if write_rows(Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start'])) > 0:
+            #an engineer already enrolled or waiting keeps their place
+            if (Academic_record.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).first() != None or
+                    Waitlist.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).first() != None):
+                db.session.rollback()
+                return jsonify(
+                    {
+                        "message": f"{data['EID']} is already enrolled or waitlisted, engineer is not enrolled"
+                    }
+                ), 500
+            #seats go to the waitlist first, a new approval only takes a seat nobody is waiting for
+            if not waitlist_waiting(data["SID"], data["CID"], data["start"]) and reserve_seat(data["SID"], data["CID"], data["start"]):
+                academic_record = Academic_record(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start'], status = "ongoing")
+                db.session.add(academic_record)
+                db.session.commit()
+            else:
+                if not section_exists(data["SID"], data["CID"], data["start"]):
+                    db.session.rollback()
+                    return jsonify(
+                        {
+                            "message": no_seat_message(data["SID"], data["CID"], data["start"], "engineer is not enrolled")
+                        }
+                    ), 500
+                # the section is full or engineers are waiting, the engineer waits for a seat at the back of the waitlist
+                waitlist = Waitlist(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start'])
+                db.session.add(waitlist)
+                db.session.flush()
+                # a seat freed since the reservation failed goes to the head of the waitlist
+                promoted = fill_from_waitlist(data["SID"], data["CID"], data["start"])
+                db.session.commit()
+                if data['EID'] not in promoted:
+                    return jsonify(
+                        {
+                            "message": f"Section {data['SID'], data['CID']} has no vacancy, {data['EID']} has been added to the waitlist",
+                            "data": waitlist.to_dict()
+                        }
+                    ), 200
+                academic_record = Academic_record.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).first()
             return jsonify(
                 {
                     "message": f"{data['EID']} prerequisites has been moved successfully from Enrollment to academic_record",
@@ -1007,12 +2896,14 @@ def hr_approve_signup():
                 }
             ), 200
         else:
+            db.session.rollback()
             return jsonify(
                 {
                     "message": f"Academic record {data['EID']} is not present, engineer is not enrolled",
                 }), 500
 
     except Exception as e:
+        db.session.rollback()
         return jsonify(
         {
             "message": f"{data['EID']} prerequisites is not moved successfully"
@@ -1038,20 +2929,9 @@ def hr_reject_signup():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     try:
-        exist = (Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).first() != None)
-        if exist :
-            Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']).delete()
-            db.session.commit()
-            return jsonify(
-            {
-                "message": f"{data['EID']} has been deleted successfully from Enrollment"
-            }
-            ), 200
-        else:
-            return jsonify(
-                {
-                    "message": f"Enrollment {data['EID']} is not present in database,  engineer is not rejected",
-                }), 500
+        count = write_rows(Enrollment.query.filter_by(EID = data['EID'], SID = data['SID'], CID = data['CID'], start = data['start']))
+        return write_response(count, f"{data['EID']} has been deleted successfully from Enrollment",
+                              f"Enrollment {data['EID']} is not present in database,  engineer is not rejected")
     except Exception as e:
         return jsonify(
         {
@@ -1078,31 +2958,28 @@ def hr_assign_trainer():
         ), 500
     else:
         data["start"] = datetime.fromisoformat(data["start"])
-        exist = (Section.query.filter_by(SID = data['SID'], CID = data['CID'], start = data["start"]).first() != None)
-        if exist:
-            try:
-                section = Section.query.filter_by(SID = data['SID'], CID = data['CID'], start = data["start"])
-                section.update(dict(TID = data['TID']))
-                section = Section.query.filter_by(SID = data['SID'], CID = data['CID'], start = data["start"]).first()
-                db.session.commit()
+        try:
+            if write_rows(Section.query.filter_by(SID = data['SID'], CID = data['CID'], start = data["start"]), dict(TID = data['TID'])) == 0:
+                db.session.rollback()
                 return jsonify(
                     {
-                    "message": f"TID {data['TID']} has been assigned to section",
-                    "data": section.to_dict()
-                }
-                ), 200
-            except Exception as e:
-                return jsonify(
-                {
-                    "message": f"TID {data['TID']} are not updated due to {e}",
-                }
-            ), 500
-        else:
+                        "message": f"Section {data['CID'], data['SID']} does not exist"
+                    }
+                    ), 500
+            db.session.commit()
+            section = Section.query.filter_by(SID = data['SID'], CID = data['CID'], start = data["start"]).first()
             return jsonify(
                 {
-                    "message": f"Section {data['CID'], data['SID']} does not exist"
-                }
-                ), 500
+                "message": f"TID {data['TID']} has been assigned to section",
+                "data": section.to_dict()
+            }
+            ), 200
+        except Exception as e:
+            return jsonify(
+            {
+                "message": f"TID {data['TID']} are not updated due to {e}",
+            }
+        ), 500
 
 
 ### End of API points for Registration functions ###
@@ -1120,7 +2997,7 @@ def view_all_sections():
         }
     ), 500
     retrieved_sections = Section.query.filter_by(TID = data['TID'])
-    sections = [section.to_dict() for section in retrieved_sections]
+    sections = select_rows(retrieved_sections, Section)
     if sections:
         return jsonify(
             {
@@ -1183,8 +3060,7 @@ def query_section():
                 "message": "Section cannot be query"
             }), 500
     try:
-        retrieved_section = Section.query.filter_by(CID=data["CID"])
-        sections = [section.to_dict() for section in retrieved_section]
+        sections = select_rows(Section.query.filter_by(CID=data["CID"]), Section)
         if len(sections) == 0:
             return jsonify(
             {
@@ -1229,6 +3105,8 @@ def update_section_detail():
         section = Section.query.filter_by(SID=data["SID"], CID=data["CID"], start=date_object_start)
 
         section.update(dict(SID=data['SID'],CID=data['CID'],start=date_object_start,end=date_object_end,vacancy=data['vacancy'],TID=data['TID']))
+        #a raised vacancy goes to the engineers waiting for the section
+        fill_from_waitlist(data["SID"], data["CID"], date_object_start)
 
         db.session.commit()
 
@@ -1274,22 +3152,8 @@ def delete_section():
         ), 500
     try:
         date_object_start = datetime.fromisoformat(data["start"])
-        section_query = Section.query.filter_by(SID=data["SID"], CID=data["CID"], start=date_object_start)
-        if section_query.first():
-            section_query.delete()
-            db.session.commit()
-            return jsonify(
-            {
-                "message": f"Section {data['SID']} has been deleted successfully from the database"
-            }
-            ), 200
-        else:
-            return jsonify(
-            {
-                "message": f"Section {data['SID']} is not deleted"
-            }
-            ), 500
-        
+        count = write_rows(Section.query.filter_by(SID=data["SID"], CID=data["CID"], start=date_object_start))
+        return write_response(count, f"Section {data['SID']} has been deleted successfully from the database", f"Section {data['SID']} is not deleted")
 
     except Exception as e:
         return jsonify(
@@ -1353,7 +3217,9 @@ def view_all_section_content():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     retrieved_section_content = Content.query.filter_by(SID = data['SID'], CID = data['CID'], start = data['start'])
-    section_contents = [section_content.to_dict() for section_content in retrieved_section_content]
+    if wants_stream():
+        return stream_rows(retrieved_section_content, Content, f"All sections content are retrieved for section {data['CID'], data['SID']}", "There are no section content retrieved")
+    section_contents = select_rows(retrieved_section_content, Content)
     if section_contents:
         return jsonify(
             {
@@ -1385,7 +3251,7 @@ def view_lesson_content():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     retrieved_content = Content.query.filter_by(SID = data['SID'], CID = data['CID'], LID = data['LID'], start = data['start'])
-    contents = [content.to_dict() for content in retrieved_content]
+    contents = select_rows(retrieved_content, Content)
     if contents:
         return jsonify(
             {
@@ -1421,31 +3287,34 @@ def update_content():
             data[change] = data[str('old_'+change)]
     data["start"] = datetime.fromisoformat(data["start"])
     data["old_start"] = datetime.fromisoformat(data["old_start"])
-    exist = (Content.query.filter_by(SID = data["old_SID"], CID = data["old_CID"], LID = data["old_LID"], start = data["old_start"], content_name = data["old_content_name"]).first() != None)
-    if exist:
-        try:
-            Content.query.filter_by(SID = data["old_SID"], CID = data["old_CID"], LID = data["old_LID"], start = data["old_start"], content_name = data["old_content_name"]).delete()
-            content = Content(SID=data["SID"], CID=data["CID"], LID=data["LID"], start=data["start"], content_name=data["content_name"], content_type=data["content_type"], link=data["link"])
-            db.session.add(content)
-            db.session.commit()
+    try:
+        old_content = Content.query.filter_by(SID = data["old_SID"], CID = data["old_CID"], LID = data["old_LID"], start = data["old_start"], content_name = data["old_content_name"])
+        ordinal = old_content.with_entities(Content.ordinal).scalar()
+        if write_rows(old_content) == 0:
+            db.session.rollback()
             return jsonify(
             {
-                "message": f"Content {data['old_CID'], data['old_SID'], data['old_LID'], data['content_name']}'s details have been updated successfully in the database",
-                "data": content.to_dict()
-            }
-            ), 200
+                "message": f"Content {data['old_CID'], data['old_SID'], data['old_LID'], data['old_content_name']} do not exist"
+            }), 500
+        #a content edited within its lesson keeps its ordinal and so its viewed state
+        if (data["SID"], data["CID"], data["LID"], data["start"]) != (data["old_SID"], data["old_CID"], data["old_LID"], data["old_start"]):
+            ordinal = None
+        content = Content(SID=data["SID"], CID=data["CID"], LID=data["LID"], start=data["start"], content_name=data["content_name"], content_type=data["content_type"], link=data["link"], ordinal=ordinal)
+        db.session.add(content)
+        db.session.commit()
+        return jsonify(
+        {
+            "message": f"Content {data['old_CID'], data['old_SID'], data['old_LID'], data['content_name']}'s details have been updated successfully in the database",
+            "data": content.to_dict()
+        }
+        ), 200
 
-        except Exception as e:
-            return jsonify(
-            {
-                "message": f"Content{data['old_CID'], data['old_SID'], data['old_LID'], data['old_content_name']} is not updated"
-            }
-        ), 500
-    else:
+    except Exception as e:
         return jsonify(
         {
-            "message": f"Content {data['old_CID'], data['old_SID'], data['old_LID'], data['old_content_name']} do not exist"
-        }), 500
+            "message": f"Content{data['old_CID'], data['old_SID'], data['old_LID'], data['old_content_name']} is not updated"
+        }
+    ), 500
 
 
 
@@ -1466,27 +3335,16 @@ def delete_content():
             }
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
-    exist = (Content.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], content_name = data["content_name"]).first() != None)
-    if exist:
-        try:
-            Content.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], content_name = data["content_name"]).delete()
-            db.session.commit()
-            return jsonify(
-            {
-                "message": f"Content { data['CID'], data['SID'], data['LID'], data['content_name']} has been deleted successfully from the database"
-            }
-            ), 200
-        except Exception as e:
-            return jsonify(
-            {
-                "message": f"Content {data['CID'], data['SID'], data['LID'], data['content_name']} is not deleted"
-            }
-    ), 500
-    else:
+    try:
+        count = write_rows(Content.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], content_name = data["content_name"]))
+        return write_response(count, f"Content { data['CID'], data['SID'], data['LID'], data['content_name']} has been deleted successfully from the database",
+                              f"Content {data['CID'], data['SID'], data['LID'], data['content_name']} do not exist")
+    except Exception as e:
         return jsonify(
         {
-            "message": f"Content {data['CID'], data['SID'], data['LID'], data['content_name']} do not exist"
-        }), 500
+            "message": f"Content {data['CID'], data['SID'], data['LID'], data['content_name']} is not deleted"
+        }
+    ), 500
     
 
 ### End of API points for Material CRUD ###
@@ -1496,13 +3354,20 @@ def delete_content():
 #view all lessons
 @app.route("/view_lessons", methods=['GET'])
 def view_all_lessons():
-    retrieved_lessons = Lesson.query.all()
-    lessons = [lesson.to_dict() for lesson in retrieved_lessons]
+    try:
+        lessons, page = read_page(Lesson.query, Lesson)
+    except ValueError:
+        return jsonify(
+            {
+                "message": "limit or after is invalid"
+            }
+        ), 500
     if lessons:
         return jsonify(
             {
                 "message": "All lessons are retrieved",
-                "data": lessons
+                "data": lessons,
+                **page
             }
         ), 200
     return jsonify(
@@ -1518,7 +3383,7 @@ def query_lessons():
     try:
         date_object_start = datetime.fromisoformat(data["start"])
         retrieved_lessons = Lesson.query.filter_by(SID=data['SID'] ,CID=data["CID"], start=date_object_start)
-        lessons = [lesson.to_dict() for lesson in retrieved_lessons]
+        lessons = select_rows(retrieved_lessons, Lesson)
 
         if len(lessons) == 0:
             return jsonify(
@@ -1592,27 +3457,16 @@ def delete_lesson():
                 "message": f"Lesson {not_present} is not present, lesson is not successfully deleted"
             }
         ), 500
-    exist = (Lesson.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start=date_object_start).first() != None)
-    if exist:
-        try:
-            Lesson.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start=date_object_start).delete()
-            db.session.commit()
-            return jsonify(
-            {
-                "message": f"Lesson { data['CID'], data['SID'], data['LID'], data['start']} has been deleted successfully from the database"
-            }
-            ), 200
-        except Exception as e:
-            return jsonify(
-            {
-                "message": f"Lesson {data['CID'], data['SID'], data['LID'], data['start']} is not deleted"
-            }
-    ), 500
-    else:
+    try:
+        count = write_rows(Lesson.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start=date_object_start))
+        return write_response(count, f"Lesson { data['CID'], data['SID'], data['LID'], data['start']} has been deleted successfully from the database",
+                              f"Lesson {data['CID'], data['SID'], data['LID'], data['start']} do not exist")
+    except Exception as e:
         return jsonify(
         {
-            "message": f"Lesson {data['CID'], data['SID'], data['LID'], data['start']} do not exist"
-        }), 500
+            "message": f"Lesson {data['CID'], data['SID'], data['LID'], data['start']} is not deleted"
+        }
+    ), 500
 
 ### End of API point for lesson CRUD ###
 
@@ -1665,7 +3519,7 @@ def read_quiz():
     data["start"] = datetime.fromisoformat(data["start"])
     try:
         quiz_questions = Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"], CID=data["CID"], start=data["start"])
-        all_questions = [question.to_dict() for question in quiz_questions]
+        all_questions = select_rows(quiz_questions, Quiz_questions)
         if len(all_questions) == 0:
             return jsonify(
             {
@@ -1738,25 +3592,17 @@ def update_quiz_question():
     data["start"] = datetime.fromisoformat(data["start"])
     try:
         question = Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"], CID=data["CID"], start=data["start"], question=data["question"])
-        if question.first() == None:
+        possible_update_columns = ['answer', 'options', 'duration', 'type']
+        # with nothing to change the question is written back unchanged, so the row count still tells whether it exists
+        values = {column: data[column] for column in possible_update_columns if column in data.keys()} or dict(question=data['question'])
+        if write_rows(question, values) == 0:
+            db.session.rollback()
             return jsonify(
             {
                 "message": f"Quiz question \'{data['question']}\' with LID {data['LID']}, SID {data['SID']}, CID {data['CID']}, start {data['start']} does not exist in database",
             }
         ), 500
-        # possible_update_columns = ['answer', 'options', 'duration', 'type']
-        if 'answer' in data.keys():
-            question.update(dict(answer=data['answer']))
-            
-        if 'options' in data.keys():
-            question.update(dict(options=data['options']))
-           
-        if 'duration' in data.keys():
-            question.update(dict(duration=data['duration']))
-            
-        if 'type' in data.keys():
-            question.update(dict(type=data['type']))
-
+        mark_quiz_changed(db.session, data["LID"], data["SID"], data["CID"], data["start"])
         db.session.commit()
         question = Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"], CID=data["CID"], start=data["start"], question=data["question"]).first()
         return jsonify(
@@ -1787,21 +3633,10 @@ def delete_quiz():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     try:
-        quiz_questions = Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"], CID=data["CID"], start=data["start"])
-        all_questions = [question.to_dict() for question in quiz_questions]
-        if len(all_questions) == 0:
-            return jsonify(
-            {
-                "message": f"Quiz with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} does not exist in the database",
-            }
-        ), 500
-        quiz_questions.delete()
-        db.session.commit()
-        return jsonify(
-            {
-                "message": f"Quiz with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been deleted successfully",
-            }
-        ), 200
+        count = write_rows(Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"], CID=data["CID"], start=data["start"]))
+        mark_quiz_changed(db.session, data["LID"], data["SID"], data["CID"], data["start"])
+        return write_response(count, f"Quiz with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been deleted successfully",
+                              f"Quiz with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} does not exist in the database")
     except Exception as e:
         return jsonify(
         {
@@ -1824,21 +3659,10 @@ def delete_quiz_question():
         ), 500
     data["start"] = datetime.fromisoformat(data["start"])
     try:
-        quiz_question = Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"],CID=data["CID"], start=data["start"], question=data["question"])
-        question = quiz_question.first()
-        if question == None:
-            return jsonify(
-            {
-                "message": f"Quiz question \'{data['question']}\' with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} does not exist in the database",
-            }
-        ), 500
-        quiz_question.delete()
-        db.session.commit()
-        return jsonify(
-            {
-                "message": f"Quiz question \'{data['question']}\' with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been deleted successfully",
-            }
-        ), 200
+        count = write_rows(Quiz_questions.query.filter_by(LID=data["LID"], SID=data["SID"],CID=data["CID"], start=data["start"], question=data["question"]))
+        mark_quiz_changed(db.session, data["LID"], data["SID"], data["CID"], data["start"])
+        return write_response(count, f"Quiz question \'{data['question']}\' with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been deleted successfully",
+                              f"Quiz question \'{data['question']}\' with LID: {data['LID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} does not exist in the database")
     except Exception as e:
         return jsonify(
         {
@@ -1865,22 +3689,29 @@ def check_quiz_result():
         ), 500
 
     data["start"] = datetime.fromisoformat(data["start"])
-    record_exist = (Quiz_record.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], EID = data["EID"]).first() != None)
-    quiz_exist= (Quiz_questions.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"]).first() != None)
+    #answers are joined to their questions in one query and marked right or wrong by the database
+    columns = Quiz_record.serializer.columns
+    student_answer = db.session.query(*columns, Quiz_questions.question, Quiz_questions.answer, Quiz_questions.options,
+        case((Quiz_record.answer_given == Quiz_questions.answer, 'right'), else_='wrong')).outerjoin(Quiz_questions, and_(
+        Quiz_questions.SID == Quiz_record.SID, Quiz_questions.CID == Quiz_record.CID, Quiz_questions.LID == Quiz_record.LID,
+        Quiz_questions.start == Quiz_record.start, Quiz_questions.question == Quiz_record.question)).filter(
+        Quiz_record.SID == data["SID"], Quiz_record.CID == data["CID"], Quiz_record.LID == data["LID"],
+        Quiz_record.start == data["start"], Quiz_record.EID == data["EID"])
+    answers = list()
+    quiz_exist = False
+    for row in student_answer:
+        answer = Quiz_record.serializer.row(row[:len(columns)])
+        question, answer['correct_answer'], answer['options'], answer['right_wrong'] = row[len(columns):]
+        if question is None:
+            del answer['correct_answer'], answer['options'], answer['right_wrong']
+        else:
+            quiz_exist = True
+        answers.append(answer)
+    record_exist = len(answers) > 0
+    if not quiz_exist:
+        #only an unsuccessful request checks for the quiz on its own
+        quiz_exist = len(answer_keys.get(data["LID"], data["SID"], data["CID"], data["start"])) > 0
     if record_exist and quiz_exist:
-        student_answer=Quiz_record.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], EID = data["EID"])
-        quiz_question=Quiz_questions.query.filter_by(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"])
-        answers = [answer.to_dict() for answer in student_answer]
-        questions = [question.to_dict() for question in quiz_question]
-        for answer in answers:
-            for question in questions:
-                if question['question'] == answer['question']:
-                    answer['correct_answer'] = question['answer']
-                    answer['options'] = question['options']
-                    if answer['answer_given'] == answer['correct_answer']:
-                        answer['right_wrong'] = 'right'
-                    else:
-                        answer['right_wrong'] = 'wrong'
         return jsonify(
         {
             "message": f"Quiz record { data['CID'], data['SID'], data['LID'], data['EID']} has been retrieved successfully from the database",
@@ -1929,26 +3760,37 @@ def submit_quiz():
         }), 500
     else:
         try:
-            varlist = list()
             text=''
-            counter = 0
             score = 0
+            #grade the answers against the answer key, marks sent by the client are ignored
+            answer_key = answer_keys.get(data["LID"], data["SID"], data["CID"], data["start"])
+            #a graded quiz without questions does not exist, the academic record is left untouched
+            if data['type'] =='graded' and len(answer_key) == 0:
+                return jsonify(
+                {
+                    "message": f"Quiz question {data['CID'], data['SID'], data['LID']} do not exist"
+                }), 500
+            records = dict()
             for question in data['QAMarks']:
-                counter+=1
-                if question["marks"]>0:
-                    score+=1
-                globals()[f"entry_{counter}"]=Quiz_record(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], EID = data["EID"], question = question['question'], answer_given = question['answer'], marks = question['marks'])
-                varlist.append(globals()[f"entry_{counter}"])
+                #questions outside of the answer key are ignored and each question is answered once
+                if question['question'] not in answer_key or question['question'] in records:
+                    continue
+                marks = grade(answer_key, question['question'], question['answer'])
+                score += marks
+                records[question['question']] = dict(SID = data["SID"], CID = data["CID"], LID = data["LID"], start = data["start"], EID = data["EID"], question = question['question'], answer_given = question['answer'], marks = marks)
+            records = list(records.values())
             if data['type'] =='graded':
-                if score/counter < 0.85:
+                mark_engineers_changed(db.session, [data["EID"]])
+                #the score is out of every question of the quiz, not only the answered ones
+                if score/len(answer_key) < 0.85:
                     Academic_record.query.filter_by(SID = data["SID"], CID = data["CID"], start = data["start"], EID = data["EID"]).delete()
                     text='Engineer failed the course'
                 else:
                     record = Academic_record.query.filter_by(SID = data["SID"], CID = data["CID"], start = data["start"], EID = data["EID"])
                     record.update(dict(status = 'completed'))
                     text='Engineer passed the course'
-            for var in varlist:
-                db.session.add(var)
+            #all answers are written with one executemany in the same transaction
+            db.session.bulk_insert_mappings(Quiz_record, records)
             db.session.commit()
             return jsonify(
                 {
@@ -1963,6 +3805,67 @@ def submit_quiz():
         ), 500
 
 
+@app.route("/grade_section_quiz", methods=['POST'])
+#grade or re-grade the graded quiz of every engineer in a section
+def grade_section_quiz():
+    data = request.get_json()
+    fields = ['LID', 'SID', 'CID', 'start']
+    for key in fields:
+        if key not in data.keys():
+            return jsonify(
+            {
+                "message": f"{key} is missing from request body, quiz grading failed",
+            }
+        ), 500
+    data["start"] = datetime.fromisoformat(data["start"])
+    answer_key = answer_keys.get(data["LID"], data["SID"], data["CID"], data["start"])
+    if len(answer_key) == 0:
+        return jsonify(
+        {
+            "message": f"Quiz question {data['CID'], data['SID'], data['LID']} do not exist"
+        }), 500
+    #only a graded quiz decides the academic records of the section
+    types = db.session.query(Quiz_questions.type).filter_by(LID = data["LID"], SID = data["SID"], CID = data["CID"], start = data["start"]).distinct().all()
+    if [quiz_type for quiz_type, in types] != ['graded']:
+        return jsonify(
+        {
+            "message": f"Quiz {data['CID'], data['SID'], data['LID']} is not a graded quiz, quiz grading failed"
+        }), 500
+    rows = db.session.query(Quiz_record.EID, Quiz_record.question, Quiz_record.answer_given, Quiz_record.marks).filter_by(
+        LID = data["LID"], SID = data["SID"], CID = data["CID"], start = data["start"]).all()
+    if len(rows) == 0:
+        return jsonify(
+        {
+            "message": f"Quiz record {data['CID'], data['SID'], data['LID']} do not exist"
+        }), 500
+    try:
+        marks, results = grade_section(answer_key, [row[:3] for row in rows])
+        regraded = [dict(EID = row[0], LID = data["LID"], SID = data["SID"], CID = data["CID"], start = data["start"], question = row[1], marks = mark)
+                    for row, mark in zip(rows, marks) if row[3] != mark]
+        db.session.bulk_update_mappings(Quiz_record, regraded)
+        #the score is out of every question of the quiz, not only the answered ones
+        passed = sorted(EID for EID, (score, total) in results.items() if score/len(answer_key) >= 0.85)
+        failed = sorted(EID for EID, (score, total) in results.items() if score/len(answer_key) < 0.85)
+        records = Academic_record.query.filter_by(SID = data["SID"], CID = data["CID"], start = data["start"])
+        if passed:
+            records.filter(Academic_record.EID.in_(passed)).update(dict(status = 'completed'), synchronize_session=False)
+        if failed:
+            records.filter(Academic_record.EID.in_(failed)).delete(synchronize_session=False)
+        mark_engineers_changed(db.session, results.keys())
+        db.session.commit()
+        return jsonify(
+            {
+                "message": f"Quiz {data['CID'], data['SID'], data['LID']} has been graded for {len(results)} engineers",
+                "data": {"passed": passed, "failed": failed}
+            }
+        ), 200
+    except Exception as e:
+        return jsonify(
+        {
+            "message": f"Quiz {data['CID'], data['SID'], data['LID'], e} fail to grade",
+        }
+    ), 500
+
 ### End of API points for Quiz CRUD ###
 
 
@@ -1982,12 +3885,12 @@ def unlock_next_lesson():
 
     try:
         data["start"] = datetime.fromisoformat(data["start"])
-        retrieved_progress = Progress.query.filter_by(EID=data["EID"], SID=data["SID"], CID=data["CID"], start=data["start"])
-        if retrieved_progress.first():
-            progress = [progress.to_dict() for progress in retrieved_progress]
-            new_lesson = str(int(progress[0]["latest_lesson_reached"])+1)
-            retrieved_progress.update(dict(latest_lesson_reached=new_lesson, viewed_contents=""))
-            db.session.commit()
+        # pending views belong to the current lesson, write them before it is reset
+        progress_buffer.flush()
+        values = update_progress(data["EID"], data["SID"], data["CID"], data["start"], lambda progress: dict(
+            latest_lesson_reached=str(int(progress.latest_lesson_reached)+1), viewed_contents="", viewed_bitmap=0))
+        if values:
+            new_lesson = values["latest_lesson_reached"]
             progress = Progress.query.filter_by(EID=data["EID"], SID=data["SID"], CID=data["CID"], start=data["start"]).first()
             return jsonify(
                 {
@@ -2037,7 +3940,7 @@ def view_lesson_content_status():
         # check if the lesson being queried is the latest
         # if queried lesson is latest lesson, return the viewed contents as a list
         if data["LID"] == record.latest_lesson_reached:
-            contents = record.viewed_contents.split("|")
+            contents = viewed_content_names(progress_buffer.view(record), data["LID"])
             return jsonify(
             {
                 "message": f"Progress record with EID: {data['EID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been retrieved successfully",
@@ -2047,7 +3950,7 @@ def view_lesson_content_status():
         #queried lesson is not latest lesson, retrieve all contents of the lesson from content table
         else:
             records = Content.query.filter_by(LID=data["LID"], SID=data["SID"],CID=data["CID"], start=data["start"])
-            records = [record.to_dict() for record in records]
+            records = select_rows(records, Content)
             contents = []
             for record in records:
                 contents.append(record["content_name"])
@@ -2084,20 +3987,27 @@ def view_latest_content_accessed():
     try:
         # Querying data base for the progress record
         record = Progress.query.filter_by(EID=data["EID"], SID=data["SID"],CID=data["CID"], start=data["start"])
-        if record.first() == None:
+        if progress_buffer.enabled():
+            progress = record.first()
+            found = progress != None
+            if found:
+                progress_buffer.record(progress_key(data["EID"], data["SID"], data["CID"], data["start"]), recent_content_name=data['content_name'])
+                record = progress_buffer.view(progress)
+        else:
+            # replace the recent_content_name with the new value
+            found = write_rows(record, dict(recent_content_name=data['content_name'], version=Progress.version + 1)) > 0
+            db.session.commit()
+            record = Progress.query.filter_by(EID=data["EID"], SID=data["SID"],CID=data["CID"], start=data["start"]).first()
+        if not found:
             return jsonify(
             {
                 "message": f"Progress record with EID: {data['EID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} does not exist in the database",
             }
             ), 500
-        # replace the recent_content_name with the new value
-        record.update(dict(recent_content_name=data['content_name']))
-        db.session.commit()
-        record = Progress.query.filter_by(EID=data["EID"], SID=data["SID"],CID=data["CID"], start=data["start"]).first()
         return jsonify(
         {
             "message": f"Progress record with EID: {data['EID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been updated successfully",
-            "data": record.to_dict()
+            "data": Progress.serializer.instance(record)
         }
         ), 200
     except Exception as e:
@@ -2136,20 +4046,41 @@ def update_viewed_contents():
             ), 500
         # checking if lesson queried is latest lesson
         if data["LID"] == record.latest_lesson_reached:
-            contents = record.viewed_contents.split("|")
-            if data["content_name"] not in contents:
-                contents.append(data["content_name"])
-            contents = "|".join(contents)
-
-            # replace the viewed_contents with the new value
-            record = Progress.query.filter_by(EID=data["EID"], SID=data["SID"],CID=data["CID"], start=data["start"])
-            record.update(dict(viewed_contents=contents))
-            db.session.commit()
-            
+            ordinal = db.session.query(Content.ordinal).filter_by(LID=data["LID"], SID=data["SID"], CID=data["CID"],
+                start=data["start"], content_name=data["content_name"]).scalar()
+            if progress_buffer.enabled():
+                key = progress_key(data["EID"], data["SID"], data["CID"], data["start"])
+                if ordinal is not None and ordinal < VIEWED_BITMAP_SIZE:
+                    progress_buffer.record(key, data["LID"], viewed_bitmap=1 << ordinal)
+                else:
+                    progress_buffer.record(key, data["LID"], content_name=data["content_name"])
+                progress = progress_buffer.view(record)
+            else:
+                record = Progress.query.filter_by(EID=data["EID"], SID=data["SID"],CID=data["CID"], start=data["start"])
+                if ordinal is not None and ordinal < VIEWED_BITMAP_SIZE:
+                    # set the bit of the content in the viewed bitmap, unless the next lesson was unlocked meanwhile
+                    written = write_rows(record.filter_by(latest_lesson_reached=data["LID"]),
+                                         dict(viewed_bitmap=Progress.viewed_bitmap.op('|')(1 << ordinal), version=Progress.version + 1)) > 0
+                    db.session.commit()
+                else:
+                    # add the content to viewed_contents without losing a concurrent write
+                    written = bool(update_progress(data["EID"], data["SID"], data["CID"], data["start"],
+                        lambda progress: dict(viewed_contents=merge_viewed_contents(progress.viewed_contents, [data["content_name"]]))
+                                         if progress.latest_lesson_reached == data["LID"] else {}))
+                if not written:
+                    return jsonify(
+                    {
+                        "message": f"LID {data['LID']} is not the latest lesson, no update is needed."
+                    }
+                    ), 500
+                progress = record.first()
+
+            progress_dict = Progress.serializer.instance(progress)
+            progress_dict["viewed_contents"] = "|".join(viewed_content_names(progress, data["LID"]))
             return jsonify(
             {
                 "message": f"Progress record with EID: {data['EID']}, SID: {data['SID']}, CID: {data['CID']}, start: {data['start']} has been updated successfully",
-                "data": record.first().to_dict()
+                "data": progress_dict
             }
             ), 200
         else:
@@ -2165,19 +4096,83 @@ def update_viewed_contents():
         }
         ), 500
 
+#Apply a batch of content opened, content viewed and lesson completed events
+@app.route("/progress_events", methods=["POST"])
+def progress_events():
+    #Getting data from front end
+    data = request.get_json()
+    if "events" not in data.keys() or len(data["events"]) == 0:
+        return jsonify(
+        {
+            "message": "events is missing from request body, progress events are not applied",
+        }
+    ), 500
+    #Checking if all required field are present in every event
+    events = data["events"]
+    for progress_event in events:
+        if progress_event.get("type") not in PROGRESS_EVENTS:
+            return jsonify(
+            {
+                "message": f"Event type {progress_event.get('type')} is not supported, progress events are not applied",
+            }
+        ), 500
+        for key in ['EID', 'SID', 'CID', 'start'] + PROGRESS_EVENTS[progress_event["type"]]:
+            if key not in progress_event.keys():
+                return jsonify(
+                {
+                    "message": f"{key} is missing from {progress_event['type']} event, progress events are not applied",
+                }
+            ), 500
+        progress_event["key"] = progress_key(progress_event["EID"], progress_event["SID"], progress_event["CID"], progress_event["start"])
+    try:
+        # buffered updates are written first so the events apply on top of them
+        progress_buffer.flush()
+        progress, missing = apply_progress_events(events)
+        if missing:
+            return jsonify(
+            {
+                "message": f"Progress record with EID: {missing[0]}, SID: {missing[1]}, CID: {missing[2]}, start: {missing[3]} does not exist in the database",
+            }
+            ), 500
+        records = list()
+        for values in progress.values():
+            record = SimpleNamespace(**values)
+            values = Progress.serializer.instance(record)
+            values["viewed_contents"] = "|".join(viewed_content_names(record, record.latest_lesson_reached))
+            records.append(values)
+        return jsonify(
+        {
+            "message": f"{len(events)} progress events have been applied successfully",
+            "data": records
+        }
+        ), 200
+    except Exception as e:
+        return jsonify(
+        {
+            "message": f"Error! {e}",
+        }
+        ), 500
+
 ### End of API points for Progress ###
 
 ### API points for Trainer ###
 @app.route("/view_trainers", methods=['GET'])
 #view all courses
 def view_all_trainers():
-    retrieved_trainers = Trainer.query.all()
-    trainers = [trainer.to_dict() for trainer in retrieved_trainers]
+    try:
+        trainers, page = read_page(Trainer.query, Trainer)
+    except ValueError:
+        return jsonify(
+            {
+                "message": "limit or after is invalid"
+            }
+        ), 500
     if trainers:
         return jsonify(
             {
                 "message": "All trainers are retrieved",
-                "data": trainers
+                "data": trainers,
+                **page
             }
         ), 200
     return jsonify(
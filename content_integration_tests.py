@@ -73,6 +73,43 @@ class TestViewAllSectionContent(TestApp):
             'message' : f"All sections content are retrieved for section {self.s1.CID, self.s1.SID}"
         })
 
+    # Testing function when the response is streamed
+    def test_view_all_section_content_stream(self):
+        request_body = {
+            'SID': self.s1.SID,
+            'CID': self.s1.CID,
+            'start': self.s1.start
+        }
+        self.s1.start = datetime.fromisoformat(self.s1.start)
+        self.s2.start = datetime.fromisoformat(self.s2.start)
+        db.session.add(self.s1)
+        db.session.add(self.s2)
+        db.session.commit()
+        response = self.client.post("/view_all_section_content",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        streamed = self.client.post("/view_all_section_content?stream=true",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(streamed.status_code, 200)
+        self.assertTrue(streamed.is_streamed)
+        self.assertEqual(json.loads(streamed.get_data(as_text=True)), response.json)
+
+    # Testing failed case when the response is streamed and there are no database
+    def test_view_all_section_content_stream_not_in_database(self):
+        request_body = {
+            'SID': self.s1.SID,
+            'CID': self.s1.CID,
+            'start': self.s1.start
+        }
+        response = self.client.post("/view_all_section_content?stream=true",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            "message": "There are no section content retrieved"
+        })
+
     # Testing failed case when there are no database
     def test_view_all_section_content_not_in_database(self):
         # calling view_section_content function via flask route
@@ -1,7 +1,8 @@
 import unittest
 import flask_testing
 import json
-from app import Engineer, app, db, Course, Academic_record, Engineer
+from app import Engineer, app, db, Course, Academic_record, Engineer, Section, prerequisite_graph, eligibility_store, eligibility_matrix
+from app import Course_catalog, course_catalog, Eligibility_store, Shared_generations, shared_generations, Local_generation, Redis_generation, Database_generation
 from datetime import datetime
 
 #Group member in-charge: Ivan Tan
@@ -96,6 +97,41 @@ class TestViewCourses(TestApp):
             })
 
 
+    # Testing function when courses are read one page at a time
+    def test_view_all_courses_pages(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.commit()
+
+        response = self.client.get("/view_courses?limit=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([course['CID'] for course in response.json['data']], ['IS500', 'IS600'])
+
+        response = self.client.get("/view_courses", query_string={'limit': 2, 'after': response.json['next']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'data' : [
+                {
+                'CID': 'IS700',
+                'name': 'Super Super Hard Mod',
+                'prerequisites': 'IS500,IS600'
+                }
+            ],
+            'message' : 'All courses are retrieved',
+            'next': None
+            })
+
+
+    # Testing function when limit is invalid
+    def test_view_all_courses_invalid_limit(self):
+        response = self.client.get("/view_courses?limit=0")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message' : 'limit or after is invalid'
+        })
+
+
     # Testing positive case where course is in database
     def test_query_course_in_database(self):
         # adding one course to database
@@ -216,6 +252,36 @@ class TestViewEligibleCourses(TestApp):
             }
         })
 
+    # Testing function when all prerequisites are completed
+    def test_view_eligible_courses_2(self):
+        # calling view_eligible_courses function via flask route
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.add(self.a1)
+        db.session.add(Academic_record(EID=1, SID="G1", CID="IS600", start=datetime.fromisoformat("2021-04-01 09:15:00"), status="completed"))
+        db.session.add(Academic_record(EID=2, SID="G1", CID="IS700", start=datetime.fromisoformat("2021-04-01 09:15:00"), status="ongoing"))
+        db.session.commit()
+
+        request_body = {
+            'EID': 1
+        }
+        response = self.client.post("/view_eligible_courses",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            "message": "Eligible and non-eligible courses are retrieved",
+            "data" :
+            {
+            'eligible': [{'CID': 'IS700', 'name': 'Super Super Hard Mod', 'prerequisites': 'IS500,IS600'}],
+            'non_eligible':
+                [{'CID': 'IS500', 'name': 'Super Mod', 'prerequisites': ''},
+                {'CID': 'IS600', 'name': 'Super Hard Mod', 'prerequisites': 'IS500'}]
+            }
+        })
+
     # Testing function when eid is not inserted
     def test_view_eligible_courses_no_EID(self):
         # calling view_eligible_courses function via flask route
@@ -252,6 +318,360 @@ class TestViewEligibleCourses(TestApp):
             "message": "There are no course retrieved"
             }
         )
+class TestPrerequisiteGraph(TestApp):
+    # Testing that spaces in prerequisites are ignored
+    def test_prerequisites_with_spaces(self):
+        db.session.add(self.c1)
+        db.session.add(Course(CID='IS800', name='Spaced Mod', prerequisites='IS500, IS600'))
+        db.session.commit()
+
+        self.assertEqual(prerequisite_graph.prerequisites_of('IS800'), ['IS500', 'IS600'])
+        self.assertEqual(Course.query.filter_by(CID='IS800').first().list_of_prerequisites(), ['IS500', 'IS600'])
+
+    # Testing the transitive closure of prerequisites
+    def test_all_prerequisites(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(Course(CID='IS800', name='Top Mod', prerequisites='IS600'))
+        db.session.commit()
+
+        self.assertEqual(prerequisite_graph.all_prerequisites_of('IS800'), {'IS500', 'IS600'})
+        self.assertEqual(prerequisite_graph.order, ['IS500', 'IS600', 'IS800'])
+
+    # Testing that the graph is rebuilt after prerequisites are updated
+    def test_graph_rebuilt_after_update(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.commit()
+        self.assertEqual(prerequisite_graph.prerequisites_of('IS500'), [])
+
+        request_body = {
+            'CID': 'IS500',
+            'prerequisites': 'IS111'
+        }
+        response = self.client.post("/update_course_prerequisites",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(prerequisite_graph.all_prerequisites_of('IS600'), {'IS500', 'IS111'})
+
+    # Testing that prerequisites creating a cycle are rejected
+    def test_update_prerequisites_cycle(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.commit()
+
+        request_body = {
+            'CID': 'IS500',
+            'prerequisites': 'IS600'
+        }
+        response = self.client.post("/update_course_prerequisites",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': 'IS500 prerequisites create a cycle, prerequisites is not updated'
+        })
+        self.assertEqual(Course.query.filter_by(CID='IS500').first().prerequisites, '')
+
+    # Testing that cycles already in the database are detected
+    def test_cycle_detected(self):
+        db.session.add(Course(CID='IS801', name='Loop Mod 1', prerequisites='IS802'))
+        db.session.add(Course(CID='IS802', name='Loop Mod 2', prerequisites='IS801'))
+        db.session.add(self.c1)
+        db.session.commit()
+
+        self.assertEqual(prerequisite_graph.refresh().cyclic, {'IS801', 'IS802'})
+        self.assertEqual(prerequisite_graph.all_prerequisites_of('IS801'), {'IS801', 'IS802'})
+
+
+class Redis_stand_in():
+    #keeps keys in a dict, with the get and incr of a Redis client
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+class TestCourseCatalog(TestApp):
+    def tearDown(self):
+        shared_generations.use(Local_generation())
+        super().tearDown()
+
+    def update_course_name(self, CID, name):
+        response = self.client.post("/update_course_name",
+                                    data=json.dumps({"CID": CID, "name": name}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+    # Testing that the catalog is served from memory until a course write commits
+    def test_catalog_read_through(self):
+        db.session.add(self.c1)
+        db.session.commit()
+        self.assertEqual(course_catalog.all(), [self.c1.to_dict()])
+
+        # a row written around the ORM does not move the generation
+        db.session.execute(Course.__table__.insert().values(CID='IS600', name='Super Hard Mod', prerequisites='IS500'))
+        db.session.commit()
+        self.assertEqual(course_catalog.get('IS600'), None)
+
+        self.update_course_name('IS500', 'Renamed Mod')
+        self.assertEqual(course_catalog.get('IS500')['name'], 'Renamed Mod')
+        self.assertEqual(course_catalog.get('IS600')['prerequisites'], 'IS500')
+        self.assertEqual(prerequisite_graph.prerequisites_of('IS600'), ['IS500'])
+
+    # Testing that a worker sharing a database generation reloads after another worker writes
+    def test_database_generation_shared(self):
+        shared_generations.use(Database_generation())
+        worker = Course_catalog(Shared_generations(Database_generation()))
+        db.session.add(self.c1)
+        db.session.commit()
+        self.assertEqual(worker.get('IS500')['name'], 'Super Mod')
+
+        self.update_course_name('IS500', 'Renamed Mod')
+        self.assertEqual(worker.get('IS500')['name'], 'Renamed Mod')
+
+    # Testing that a worker sharing a Redis generation reloads after another worker writes
+    def test_redis_generation_shared(self):
+        client = Redis_stand_in()
+        shared_generations.use(Redis_generation(client))
+        worker = Course_catalog(Shared_generations(Redis_generation(client)))
+        db.session.add(self.c1)
+        db.session.commit()
+        self.assertEqual(worker.get('IS500')['name'], 'Super Mod')
+
+        self.update_course_name('IS500', 'Renamed Mod')
+        self.assertEqual(worker.get('IS500')['name'], 'Renamed Mod')
+        self.assertEqual(client.get('generation:course'), 2)
+
+    # Testing that a worker sharing a database generation refreshes eligibility after another worker writes
+    def test_eligibility_generation_shared(self):
+        shared_generations.use(Database_generation())
+        worker = Eligibility_store(Shared_generations(Database_generation()))
+        db.session.add(self.c1)
+        db.session.add(self.e1)
+        db.session.commit()
+        self.assertEqual(worker.eligible_courses(1), {'IS500'})
+        self.assertEqual(worker.classify('IS500')['eligible'], [1])
+
+        db.session.add(Academic_record(EID=1, SID="G1", CID="IS500", start=datetime.fromisoformat("2021-04-01 09:15:00"), status="ongoing"))
+        db.session.commit()
+        self.assertEqual(worker.eligible_courses(1), set())
+        self.assertEqual(worker.classify('IS500')['ongoing'], [1])
+
+    # Testing that an entry loaded before a change of its key is not kept
+    def test_stamp_older_than_change(self):
+        generations = Shared_generations(Local_generation())
+        stamp = generations.current("academic_record")
+        generations.changed("academic_record", [1])
+        self.assertFalse(generations.valid("academic_record", 1, stamp))
+        self.assertTrue(generations.valid("academic_record", 2, stamp))
+        self.assertTrue(generations.valid("academic_record", 1, generations.current("academic_record")))
+
+
+class TestEligibilityStore(TestApp):
+    # Testing that eligibility is refreshed after an engineer is assigned and withdrawn
+    def test_eligibility_after_assign_and_withdraw(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.e1)
+        db.session.add(Section(SID='G1', CID='IS500', start=datetime.fromisoformat('2021-04-01 09:15:00'),
+                               end=datetime.fromisoformat('2021-05-01 09:15:00'), vacancy=1, TID=1))
+        db.session.commit()
+        self.assertEqual(eligibility_store.eligible_courses(1), {'IS500'})
+
+        request_body = {
+            'EID': 1,
+            'SID': 'G1',
+            'CID': 'IS500',
+            'start': '2021-04-01 09:15:00'
+        }
+        response = self.client.post("/hr_assign_engineer",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(eligibility_store.eligible_courses(1), set())
+        self.assertEqual(eligibility_store.classify('IS500')['ongoing'], [1])
+
+        response = self.client.post("/hr_withdraw_engineer",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(eligibility_store.eligible_courses(1), {'IS500'})
+        self.assertEqual(eligibility_store.classify('IS500')['eligible'], [1])
+
+    # Testing that new engineers are picked up by the materialized store
+    def test_classify_new_engineer(self):
+        db.session.add(self.c1)
+        db.session.add(self.e1)
+        db.session.commit()
+        self.assertEqual(eligibility_store.classify('IS500')['eligible'], [1])
+
+        db.session.add(self.e2)
+        db.session.add(self.a1)
+        db.session.commit()
+        self.assertEqual(eligibility_store.classify('IS500'), {
+            'completed': [1],
+            'eligible': [2],
+            'ineligible': [],
+            'ongoing': []
+        })
+
+
+class TestEligibilityMatrix(TestApp):
+    # Testing eligible courses of every engineer
+    def test_view_eligibility_matrix(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.add(self.a1)
+        db.session.add(self.e1)
+        db.session.add(self.e2)
+        db.session.commit()
+
+        response = self.client.get("/view_eligibility_matrix")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            "message": "Eligible courses of all engineers are retrieved",
+            "data": [
+                {"EID": 1, "eligible": ["IS600"]},
+                {"EID": 2, "eligible": ["IS500"]}
+            ]
+        })
+
+    # Testing function when there are no engineers
+    def test_view_eligibility_matrix_empty(self):
+        db.session.add(self.c1)
+        db.session.commit()
+
+        response = self.client.get("/view_eligibility_matrix")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            "message": "There are no engineer retrieved"
+        })
+
+    # Testing that the bitset matrix agrees with the materialized store
+    @unittest.skipUnless(eligibility_matrix.enabled(), "numpy is not installed")
+    def test_matrix_matches_store(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.add(self.a1)
+        db.session.add(self.a2)
+        db.session.add(self.e1)
+        db.session.add(self.e2)
+        for EID in range(3, 80):
+            db.session.add(Engineer(EID=EID, name='dude', password='123',phone=123, email='abc@abc.com', address='SCIS'))
+            db.session.add(Academic_record(EID=EID, SID="G1", CID=["IS500", "IS600", "IS700"][EID % 3], start=datetime.fromisoformat("2021-04-01 09:15:00"), status=["completed", "ongoing"][EID % 2]))
+        db.session.commit()
+
+        for CID in ["IS500", "IS600", "IS700"]:
+            self.assertEqual(eligibility_matrix.classify(CID), eligibility_store.classify(CID))
+
+    # Testing that committed academic records repack only the rows of their engineers
+    @unittest.skipUnless(eligibility_matrix.enabled(), "numpy is not installed")
+    def test_matrix_updates_changed_engineers(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.add(self.a1)
+        db.session.add(self.e1)
+        db.session.add(self.e2)
+        db.session.commit()
+        eligibility_matrix.classify("IS600")
+        completed = eligibility_matrix.completed
+
+        db.session.add(Academic_record(EID=2, SID="G1", CID="IS500", start=datetime.fromisoformat("2021-04-01 09:15:00"), status="completed"))
+        db.session.commit()
+        for CID in ["IS500", "IS600", "IS700"]:
+            self.assertEqual(eligibility_matrix.classify(CID), eligibility_store.classify(CID))
+        self.assertIs(eligibility_matrix.completed, completed)
+        self.assertEqual(eligibility_matrix.classify("IS600")["eligible"], [1, 2])
+
+
+class TestViewEligibleCoursesBulk(TestApp):
+    # Testing function when it is success case
+    def test_view_eligible_courses_bulk(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.add(self.a1)
+        db.session.commit()
+
+        request_body = {
+            'EIDs': [1, 2]
+        }
+        response = self.client.post("/view_eligible_courses_bulk",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(lines, [
+            {
+                'EID': 1,
+                'eligible': [{'CID': 'IS600', 'name': 'Super Hard Mod', 'prerequisites': 'IS500'}],
+                'non_eligible':
+                    [{'CID': 'IS500', 'name': 'Super Mod', 'prerequisites': ''},
+                    {'CID': 'IS700', 'name': 'Super Super Hard Mod', 'prerequisites': 'IS500,IS600'}]
+            },
+            {
+                'EID': 2,
+                'eligible': [{'CID': 'IS500', 'name': 'Super Mod', 'prerequisites': ''}],
+                'non_eligible':
+                    [{'CID': 'IS600', 'name': 'Super Hard Mod', 'prerequisites': 'IS500'},
+                    {'CID': 'IS700', 'name': 'Super Super Hard Mod', 'prerequisites': 'IS500,IS600'}]
+            }
+        ])
+
+    # Testing function with a course filter
+    def test_view_eligible_courses_bulk_CIDs(self):
+        db.session.add(self.c1)
+        db.session.add(self.c2)
+        db.session.add(self.c3)
+        db.session.add(self.a1)
+        db.session.commit()
+
+        request_body = {
+            'EIDs': [1],
+            'CIDs': ['IS600']
+        }
+        response = self.client.post("/view_eligible_courses_bulk",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.get_data(as_text=True)), {
+            'EID': 1,
+            'eligible': [{'CID': 'IS600', 'name': 'Super Hard Mod', 'prerequisites': 'IS500'}],
+            'non_eligible': []
+        })
+
+    # Testing function when EIDs is not inserted
+    def test_view_eligible_courses_bulk_no_EIDs(self):
+        response = self.client.post("/view_eligible_courses_bulk",
+                                    data=json.dumps({}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            "message": "EIDs is missing"
+        })
+
+    # Testing function when there are no courses
+    def test_view_eligible_courses_bulk_no_course(self):
+        response = self.client.post("/view_eligible_courses_bulk",
+                                    data=json.dumps({'EIDs': [1]}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            "message": "There are no course retrieved"
+        })
+
+
 class TestViewOngoingCompletedCourses(TestApp):
     # Testing function when it is success case
     def test_view_current_completed_courses(self):
@@ -713,6 +1133,35 @@ class TestViewQualifiedLearner(TestApp):
         })
 
 
+    # Testing that an ongoing prerequisite does not qualify a learner, the prerequisite must be completed
+    def test_view_qualified_learner_ongoing_prerequisite(self):
+        # calling view_qualified_learner function via flask route
+        db.session.add(self.c2)
+        db.session.add(self.a1)
+        db.session.add(self.e1)
+        db.session.add(self.e2)
+        db.session.add(Academic_record(EID=2, SID="G2", CID="IS500", start=datetime.fromisoformat("2021-05-01 09:15:00"), status="ongoing"))
+        db.session.commit()
+
+        request_body = {
+            'CID': self.c2.CID
+        }
+        response = self.client.post("/view_qualified_learner",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            "data" :
+            {
+            'completed': [],
+            'eligible': [1],
+            'ineligible': [2],
+            'ongoing': []
+            },
+            "message": f"Engineer is classified according to course {self.c2.CID}",
+
+        })
+
     def test_view_qualified_learner_no_CID(self):
         # calling view_eligible_courses function via flask route
         db.session.add(self.a1)
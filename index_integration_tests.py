@@ -0,0 +1,125 @@
+import unittest
+import flask_testing
+from app import app, db, full_table_scans, Academic_record, Enrollment, Section, Content, Lesson, Quiz_questions, Quiz_record, Progress, Course, Waitlist, Catalog_version
+from datetime import datetime
+
+
+class TestApp(flask_testing.TestCase):
+    app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite://"
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+    app.config['TESTING'] = True
+
+
+    def create_app(self):
+        return app
+
+
+    def setUp(self):
+        self.start = datetime.fromisoformat("2021-04-01 09:15:00")
+        db.create_all()
+
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+### INDEX TEST CASES ###
+class TestQueryPlans(TestApp):
+    # Testing that the filters used by the routes are index lookups
+    def test_academic_record_by_EID_status(self):
+        query = Academic_record.query.filter_by(EID=1, status="completed")
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_academic_record_by_CID_status(self):
+        query = Academic_record.query.filter(Academic_record.CID.in_(["IS500", "IS600"]), Academic_record.status.in_(["completed", "ongoing"]))
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_academic_record_by_section(self):
+        query = Academic_record.query.filter_by(EID=1, SID="G1", CID="IS500", start=self.start)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_section_by_TID(self):
+        query = Section.query.filter_by(TID=1)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_section_by_CID(self):
+        query = Section.query.filter_by(CID="IS500")
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_enrollment_by_EID(self):
+        query = Enrollment.query.filter_by(EID=1)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_content_by_section(self):
+        query = Content.query.filter_by(SID="G1", CID="IS500", start=self.start)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_content_by_lesson(self):
+        query = Content.query.filter_by(SID="G1", CID="IS500", LID="1", start=self.start)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_lesson_by_section(self):
+        query = Lesson.query.filter_by(SID="G1", CID="IS500", start=self.start)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_quiz_questions_by_quiz(self):
+        query = Quiz_questions.query.filter_by(LID="1", SID="G1", CID="IS500", start=self.start)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_quiz_record_by_engineer(self):
+        query = Quiz_record.query.filter_by(SID="G1", CID="IS500", LID="1", start=self.start, EID=1)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_progress_by_engineer(self):
+        query = Progress.query.filter_by(EID=1, SID="G1", CID="IS500", start=self.start)
+        self.assertEqual(full_table_scans(query), [])
+
+    def test_waitlist_head(self):
+        query = Waitlist.query.filter_by(SID="G1", CID="IS500", start=self.start).order_by(Waitlist.id).limit(1)
+        self.assertEqual(full_table_scans(query), [])
+
+    # Testing that a full scan is reported
+    def test_full_scan_reported(self):
+        self.assertEqual(full_table_scans(Course.query), ['course'])
+
+
+class TestCreateIndexes(TestApp):
+    # Testing that a database loaded from an earlier spm_lms.sql gains the new tables, columns and ordinals
+    def test_create_indexes_earlier_schema(self):
+        for table in (Content.__table__, Lesson.__table__, Progress.__table__, Catalog_version.__table__):
+            table.drop(bind=db.engine)
+        db.session.execute("CREATE TABLE lesson (LID VARCHAR(64), SID VARCHAR(64), CID VARCHAR(64), start DATETIME, PRIMARY KEY (LID, SID, CID, start))")
+        db.session.execute("CREATE TABLE content (LID VARCHAR(64), SID VARCHAR(64), CID VARCHAR(64), start DATETIME, content_name VARCHAR(64),"
+                           " content_type VARCHAR(64), link VARCHAR(64), PRIMARY KEY (LID, SID, CID, start, content_name))")
+        db.session.execute("CREATE TABLE progress (EID INTEGER, SID VARCHAR(64), CID VARCHAR(64), start DATETIME, latest_lesson_reached VARCHAR(64),"
+                           " recent_content_name VARCHAR(64), viewed_contents VARCHAR(64), PRIMARY KEY (EID, SID, CID, start))")
+        for LID, content_name in (("1", "Lesson 1 slides part 2"), ("1", "Lesson 1 slides"), ("2", "Lesson 2 slides")):
+            db.session.execute("INSERT INTO content VALUES (:LID, 'G1', 'IS500', '2021-04-01 09:15:00.000000', :content_name, 'pdf', 'abd.com')",
+                               dict(LID=LID, content_name=content_name))
+        for LID in ("1", "2", "3"):
+            db.session.execute("INSERT INTO lesson VALUES (:LID, 'G1', 'IS500', '2021-04-01 09:15:00.000000')", dict(LID=LID))
+        db.session.execute("INSERT INTO progress VALUES (1, 'G1', 'IS500', '2021-04-01 09:15:00.000000', '1', '', '')")
+        db.session.commit()
+
+        result = app.test_cli_runner().invoke(args=["create_indexes"])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("Table catalog_version is created", result.output)
+        self.assertIn("Column ordinal is added to content", result.output)
+        self.assertIn("Index content_lesson_ordinal on content is present", result.output)
+        ordinals = db.session.query(Content.LID, Content.content_name, Content.ordinal).order_by(Content.LID, Content.ordinal).all()
+        self.assertEqual(ordinals, [("1", "Lesson 1 slides", 0), ("1", "Lesson 1 slides part 2", 1), ("2", "Lesson 2 slides", 0)])
+        self.assertEqual([lesson.next_ordinal for lesson in Lesson.query.order_by(Lesson.LID)], [2, 1, 0])
+        progress = Progress.query.first()
+        self.assertEqual((progress.viewed_bitmap, progress.version), (0, 0))
+
+        result = app.test_cli_runner().invoke(args=["create_indexes"])
+        self.assertNotIn("is added", result.output)
+
+### INDEX TEST CASES ###
+
+if __name__ == '__main__':
+    #For jenkins
+    import xmlrunner
+    unittest.main(testRunner=xmlrunner.XMLTestRunner(output='test-reports'))
+    #For local tests
+    # unittest.main()
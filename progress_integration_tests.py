@@ -1,8 +1,13 @@
 import unittest
 import flask_testing
 import json
-from app import Content, app, db, Progress
+from app import Content, Lesson, app, db, Progress, progress_buffer
 from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from tempfile import mkstemp
+from threading import Thread
+import os
 
 
 class TestApp(flask_testing.TestCase):
@@ -798,6 +803,294 @@ class TestUpdateViewedContents(TestApp):
             'message': f"Progress record with EID: 10, SID: {self.p3.SID}, CID: {self.p3.CID}, start: {t1} does not exist in the database"    
         })
 
+    # Testing that a content of the lesson is recorded in the viewed bitmap
+    def test_update_viewed_contents_bitmap(self):
+        t1 = "2021-04-01 09:15:00"
+        for row in (self.c1, self.c2):
+            row.start = datetime.fromisoformat(row.start)
+            db.session.add(row)
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat(t1), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+        self.assertEqual((self.c1.ordinal, self.c2.ordinal), (0, 1))
+
+        for content_name in (self.c2.content_name, self.c1.content_name, self.c2.content_name):
+            request_body = {
+                "EID": 1,
+                "SID": "G1",
+                "CID": "IS111",
+                "start": t1,
+                "content_name" : content_name,
+                "LID" : "1"
+            }
+            response = self.client.post("/update_viewed_contents",
+                                        data=json.dumps(request_body),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data']['viewed_contents'], "Lesson 1 slides|Lesson 1 slides part 2")
+        progress = Progress.query.first()
+        self.assertEqual((progress.viewed_bitmap, progress.viewed_contents), (3, ""))
+
+        del request_body["content_name"]
+        response = self.client.post("/view_lesson_content_status",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data'], ["Lesson 1 slides", "Lesson 1 slides part 2"])
+
+    # Testing that a content added after a viewed content was deleted does not take over its ordinal
+    def test_content_ordinal_not_reused(self):
+        t1 = "2021-04-01 09:15:00"
+        db.session.add(Lesson(LID='1', SID='G1', CID='IS111', start=datetime.fromisoformat(t1)))
+        for row in (self.c1, self.c2):
+            row.start = datetime.fromisoformat(row.start)
+            db.session.add(row)
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat(t1), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+        request_body = {"EID": 1, "SID": "G1", "CID": "IS111", "start": t1, "LID": "1"}
+        self.client.post("/update_viewed_contents", data=json.dumps(dict(request_body, content_name=self.c2.content_name)),
+                         content_type='application/json')
+        response = self.client.post("/delete_content", data=json.dumps(dict(request_body, content_name=self.c2.content_name)),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+
+        content = Content(LID='1', SID='G1', CID='IS111', start=datetime.fromisoformat(t1), content_type='pdf', content_name='Lesson 1 notes', link='abd.com/shared/fuie894')
+        db.session.add(content)
+        db.session.commit()
+        self.assertEqual(content.ordinal, 2)
+        response = self.client.post("/view_lesson_content_status", data=json.dumps(request_body), content_type='application/json')
+        self.assertEqual(response.json['data'], [])
+
+    # Testing that two contents of a lesson cannot share an ordinal
+    def test_content_ordinal_unique(self):
+        for row in (self.c1, self.c2):
+            row.start = datetime.fromisoformat(row.start)
+            row.ordinal = 0
+            db.session.add(row)
+        with self.assertRaises(IntegrityError):
+            db.session.commit()
+
+
+class TestProgressBuffer(TestApp):
+    def setUp(self):
+        super().setUp()
+        app.config['PROGRESS_WRITE_BEHIND'] = True
+        app.config['PROGRESS_FLUSH_INTERVAL'] = None
+
+    def tearDown(self):
+        app.config['PROGRESS_WRITE_BEHIND'] = False
+        app.config['PROGRESS_FLUSH_INTERVAL'] = 1.0
+        progress_buffer.pending.clear()
+        super().tearDown()
+
+    def post(self, route, **fields):
+        request_body = dict(EID=1, SID="G1", CID="IS111", start="2021-04-01 09:15:00", LID="1", **fields)
+        return self.client.post(route, data=json.dumps(request_body), content_type='application/json')
+
+    # Testing that buffered updates are read back before they are written
+    def test_progress_buffer(self):
+        self.c1.start = datetime.fromisoformat(self.c1.start)
+        db.session.add(self.c1)
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+
+        response = self.post("/view_latest_content_accessed", content_name=self.c1.content_name)
+        self.assertEqual(response.json['data']['recent_content_name'], self.c1.content_name)
+        self.post("/update_viewed_contents", content_name=self.c1.content_name)
+        response = self.post("/update_viewed_contents", content_name="Lesson 1 notes")
+        self.assertEqual(response.json['data']['viewed_contents'], "Lesson 1 slides|Lesson 1 notes")
+        response = self.post("/view_lesson_content_status")
+        self.assertEqual(response.json['data'], ["Lesson 1 slides", "Lesson 1 notes"])
+
+        progress = Progress.query.first()
+        self.assertEqual((progress.recent_content_name, progress.viewed_bitmap, progress.viewed_contents), ("", 0, ""))
+        self.assertEqual(progress_buffer.flush(), 1)
+        progress = Progress.query.first()
+        self.assertEqual((progress.recent_content_name, progress.viewed_bitmap, progress.viewed_contents), ("Lesson 1 slides", 1, "|Lesson 1 notes"))
+        self.assertEqual(progress_buffer.pending, {})
+
+    # Testing that reaching the flush size writes the buffered updates
+    def test_progress_buffer_flush_size(self):
+        app.config['PROGRESS_FLUSH_SIZE'] = 1
+        try:
+            db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                    recent_content_name="", viewed_contents=""))
+            db.session.commit()
+            self.post("/view_latest_content_accessed", content_name="Lesson 1 slides")
+        finally:
+            app.config['PROGRESS_FLUSH_SIZE'] = 500
+        self.assertEqual(Progress.query.first().recent_content_name, "Lesson 1 slides")
+
+    # Testing that a flush failing part way commits nothing and writes every update once when retried
+    def test_progress_buffer_flush_failure(self):
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+        self.post("/update_viewed_contents", content_name="Lesson 1 notes")
+        self.post("/view_latest_content_accessed", content_name="Lesson 1 notes")
+
+        def fail_recent(conn, cursor, statement, parameters, context, executemany):
+            if "recent_content_name" in statement and statement.startswith("UPDATE"):
+                raise RuntimeError("connection lost")
+        event.listen(db.engine, "before_cursor_execute", fail_recent)
+        try:
+            with self.assertRaises(RuntimeError):
+                progress_buffer.flush()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", fail_recent)
+        progress = Progress.query.first()
+        self.assertEqual((progress.recent_content_name, progress.viewed_contents, progress.version), ("", "", 0))
+
+        self.assertEqual(progress_buffer.flush(), 1)
+        progress = Progress.query.populate_existing().first()
+        self.assertEqual((progress.recent_content_name, progress.viewed_contents), ("Lesson 1 notes", "|Lesson 1 notes"))
+        self.assertEqual(progress_buffer.pending, {})
+
+    # Testing that buffered views of a lesson are dropped once the next lesson is unlocked
+    def test_progress_buffer_next_lesson_unlocked(self):
+        self.c1.start = datetime.fromisoformat(self.c1.start)
+        db.session.add(self.c1)
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+
+        self.post("/update_viewed_contents", content_name=self.c1.content_name)
+        self.post("/update_viewed_contents", content_name="Lesson 1 notes")
+        #another worker unlocks the next lesson before the buffer is flushed
+        progress = Progress.query.first()
+        progress.latest_lesson_reached = "2"
+        db.session.commit()
+
+        self.assertEqual(progress_buffer.flush(), 1)
+        progress = Progress.query.first()
+        self.assertEqual((progress.latest_lesson_reached, progress.viewed_bitmap, progress.viewed_contents), ("2", 0, ""))
+        self.assertEqual(progress_buffer.pending, {})
+
+
+class TestProgressEvents(TestApp):
+    def post(self, events):
+        return self.client.post("/progress_events", data=json.dumps({"events": events}), content_type='application/json')
+
+    # Testing that a batch of events is applied to every progress record in it
+    def test_progress_events(self):
+        self.c1.start = datetime.fromisoformat(self.c1.start)
+        db.session.add(self.c1)
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.add(Progress(EID=2, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+        progress = dict(SID="G1", CID="IS111", start="2021-04-01 09:15:00")
+        response = self.post([
+            dict(progress, EID=1, type="content_opened", content_name="Lesson 1 slides"),
+            dict(progress, EID=1, type="content_viewed", LID="1", content_name="Lesson 1 slides"),
+            dict(progress, EID=1, type="content_viewed", LID="1", content_name="Lesson 1 notes"),
+            dict(progress, EID=2, type="content_viewed", LID="1", content_name="Lesson 1 slides"),
+            dict(progress, EID=2, type="lesson_completed", LID="1"),
+            dict(progress, EID=2, type="lesson_completed", LID="1"),
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'message': "6 progress events have been applied successfully",
+            'data': [
+                {
+                    'EID': 1,
+                    'SID': "G1",
+                    'CID': "IS111",
+                    'start': "2021-04-01 09:15:00",
+                    'latest_lesson_reached': "1",
+                    'recent_content_name': "Lesson 1 slides",
+                    'viewed_contents': "Lesson 1 slides|Lesson 1 notes"
+                },
+                {
+                    'EID': 2,
+                    'SID': "G1",
+                    'CID': "IS111",
+                    'start': "2021-04-01 09:15:00",
+                    'latest_lesson_reached': "2",
+                    'recent_content_name': "",
+                    'viewed_contents': ""
+                }
+            ]
+        })
+        self.assertEqual([(x.viewed_bitmap, x.viewed_contents, x.version) for x in Progress.query.order_by(Progress.EID)],
+                         [(1, "|Lesson 1 notes", 1), (0, "", 1)])
+
+    # Testing that no event is applied when a progress record does not exist
+    def test_progress_events_not_in_database(self):
+        self.p3.start = datetime.fromisoformat(self.p3.start)
+        db.session.add(self.p3)
+        db.session.commit()
+        response = self.post([
+            dict(EID=1, SID="G1", CID="IS111", start="2021-04-01 09:15:00", type="content_opened", content_name="Lesson 2 slides part 2"),
+            dict(EID=10, SID="G1", CID="IS111", start="2021-04-01 09:15:00", type="content_opened", content_name="Lesson 2 slides part 2"),
+        ])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "Progress record with EID: 10, SID: G1, CID: IS111, start: 2021-04-01 09:15:00 does not exist in the database"
+        })
+        self.assertEqual(Progress.query.first().recent_content_name, self.p3.recent_content_name)
+
+    # Testing an event with a missing field
+    def test_progress_events_missing_lid(self):
+        response = self.post([dict(EID=1, SID="G1", CID="IS111", start="2021-04-01 09:15:00", type="content_viewed", content_name="Lesson 2 slides")])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "LID is missing from content_viewed event, progress events are not applied"
+        })
+
+    # Testing an event of an unknown type
+    def test_progress_events_unknown_type(self):
+        response = self.post([dict(EID=1, SID="G1", CID="IS111", start="2021-04-01 09:15:00", type="quiz_taken")])
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "Event type quiz_taken is not supported, progress events are not applied"
+        })
+
+
+class TestProgressConcurrency(TestApp):
+    # threads need a database file, an in-memory database is one connection shared by every thread
+    def setUp(self):
+        handle, self.path = mkstemp(suffix='.db')
+        os.close(handle)
+        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///" + self.path
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        db.get_engine().dispose()
+        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite://"
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+        os.remove(self.path)
+
+    # Testing that no view is lost when one progress record is updated from many threads
+    def test_update_viewed_contents_concurrent(self):
+        db.session.add(Progress(EID=1, SID="G1", CID="IS111", start=datetime.fromisoformat("2021-04-01 09:15:00"), latest_lesson_reached="1",
+                                recent_content_name="", viewed_contents=""))
+        db.session.commit()
+        statuses = list()
+
+        def view(thread):
+            client = app.test_client()
+            for number in range(10):
+                request_body = dict(EID=1, SID="G1", CID="IS111", start="2021-04-01 09:15:00", LID="1", content_name=f"{thread}.{number}")
+                response = client.post("/update_viewed_contents", data=json.dumps(request_body), content_type='application/json')
+                statuses.append(response.status_code)
+
+        threads = [Thread(target=view, args=(thread,)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * 80)
+        progress = Progress.query.populate_existing().first()
+        self.assertEqual(sorted(progress.viewed_contents.split("|")[1:]), sorted(f"{thread}.{number}" for thread in range(8) for number in range(10)))
+        self.assertEqual(progress.version, 80)
+
 if __name__ == '__main__':
     #For jenkins
     import xmlrunner
@@ -1042,6 +1042,30 @@ class TestUpdateQuizQuestion(TestApp):
         })
 
 
+    # Testing positive case where the question exists but no field is changed
+    def test_update_quiz_question_no_change(self):
+        t1 = self.gq1q2.start
+        self.gq1q2.start = datetime.fromisoformat(self.gq1q2.start)
+        db.session.add(self.gq1q2)
+        db.session.commit()
+
+        # Preparing request body
+        request_body = {
+            'LID': self.gq1q2.LID,
+            'SID': self.gq1q2.SID,
+            'CID': self.gq1q2.CID,
+            'question': self.gq1q2.question,
+            'start': t1
+        }
+        # calling update_quiz_question function via flask route
+        response = self.client.post("/update_quiz_question",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], f"Quiz question \'{self.gq1q2.question}\' has been updated")
+        self.assertEqual(response.json['data']['answer'], self.gq1q2.answer)
+
+
 class TestDeleteQuiz(TestApp):
     # Testing positive case where all details are present in request body
     def test_delete_quiz_all_details(self):
@@ -1,7 +1,8 @@
 import unittest
 import flask_testing
 import json
-from app import app, db, Quiz_questions, Quiz_record
+from app import app, db, Quiz_questions, Quiz_record, Academic_record, answer_keys, grade_section
+from app import Answer_key_cache, Shared_generations, shared_generations, Local_generation, Database_generation
 from datetime import datetime
 
 
@@ -129,6 +130,28 @@ class TestCheckQuizResult(TestApp):
             ,
             'message' : f"Quiz record { self.a1.CID, self.a1.SID, self.a1.LID, self.a1.EID} has been retrieved successfully from the database"
         })
+    # Testing that an answer to a question removed from the quiz is returned without a correct answer
+    def test_check_quiz_result_question_removed(self):
+        for row in (self.q1, self.a1, self.a2):
+            row.start = datetime.fromisoformat(row.start)
+            db.session.add(row)
+        db.session.commit()
+        request_body = {
+            'LID': self.a1.LID,
+            'SID': self.a1.SID,
+            'CID': self.a1.CID,
+            'start' : str(self.a1.start),
+            'EID': self.a1.EID
+        }
+        response = self.client.post("/check_quiz_result",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        answers = {x['question']: x for x in response.json['data']}
+        self.assertEqual(answers[self.q1.question]['right_wrong'], 'right')
+        self.assertEqual(answers[self.q1.question]['options'], self.q1.options)
+        self.assertNotIn('correct_answer', answers[self.a2.question])
+
     def test_check_quiz_result_no_EID(self):
         t1 = self.a1.start
         #add dummy ungraded quizzes into database
@@ -342,8 +365,12 @@ class TestCheckSubmitQuiz(TestApp):
 
     def test_submit_quiz_details_graded_pass(self):
         t1 = self.a1.start
-        #add dummy ungraded quizzes into database
-        # Preparing request body
+        #add the answer key into database
+        for question in (self.q1, self.q2, self.q3):
+            question.start = datetime.fromisoformat(question.start)
+            db.session.add(question)
+        db.session.commit()
+        # Preparing request body, marks are graded by the server
         request_body = {
             'LID': self.a1.LID,
             'SID': self.a1.SID,
@@ -351,19 +378,19 @@ class TestCheckSubmitQuiz(TestApp):
             'start' : t1,
             'EID': self.a1.EID,
             'QAMarks': [{
-                'question': self.a1.question,
-                'answer': self.a1.answer_given,
-                'marks': 1
+                'question': self.q1.question,
+                'answer': self.q1.answer,
+                'marks': 0
             },
             {
-                'question': self.a2.question,
-                'answer': self.a2.answer_given,
-                'marks': 1
+                'question': self.q2.question,
+                'answer': self.q2.answer,
+                'marks': 0
             },
             {
-                'question': self.a3.question,
-                'answer': self.a3.answer_given,
-                'marks': 1
+                'question': self.q3.question,
+                'answer': self.q3.answer,
+                'marks': 0
             },
             ],
             'type': 'graded'
@@ -380,7 +407,11 @@ class TestCheckSubmitQuiz(TestApp):
 
     def test_submit_quiz_details_graded_fail(self):
         t1 = self.a1.start
-        #add dummy ungraded quizzes into database
+        #add the answer key into database
+        for question in (self.q1, self.q2, self.q3):
+            question.start = datetime.fromisoformat(question.start)
+            db.session.add(question)
+        db.session.commit()
         # Preparing request body
         request_body = {
             'LID': self.a1.LID,
@@ -415,6 +446,116 @@ class TestCheckSubmitQuiz(TestApp):
             'message' : f"Quiz record { self.a1.CID, self.a1.SID, self.a1.LID, self.a1.EID} has been inserted successfully into the database.Engineer failed the course"
         })
 
+    # Testing that a graded submission to a quiz without questions keeps the academic record
+    def test_submit_quiz_graded_no_quiz(self):
+        db.session.add(Academic_record(EID=self.a1.EID, SID=self.a1.SID, CID=self.a1.CID, start=datetime.fromisoformat(self.a1.start), status='ongoing'))
+        db.session.commit()
+        request_body = {
+            'LID': self.a1.LID,
+            'SID': self.a1.SID,
+            'CID': self.a1.CID,
+            'start' : self.a1.start,
+            'EID': self.a1.EID,
+            'QAMarks': [{'question': self.a1.question, 'answer': self.a1.answer_given, 'marks': 1}],
+            'type': 'graded'
+        }
+        response = self.client.post("/submit_quiz",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message' : f"Quiz question { self.a1.CID, self.a1.SID, self.a1.LID} do not exist"
+        })
+        self.assertEqual([x.status for x in Academic_record.query.filter_by(EID=self.a1.EID)], ['ongoing'])
+        self.assertEqual(Quiz_record.query.all(), [])
+
+    # Testing that marks sent by the client are ignored when grading
+    def test_submit_quiz_graded_client_marks_ignored(self):
+        for question in (self.q1, self.q2, self.q3):
+            question.start = datetime.fromisoformat(question.start)
+            db.session.add(question)
+        db.session.commit()
+        request_body = {
+            'LID': self.a1.LID,
+            'SID': self.a1.SID,
+            'CID': self.a1.CID,
+            'start' : self.a1.start,
+            'EID': self.a1.EID,
+            'QAMarks': [{'question': a.question, 'answer': a.answer_given, 'marks': 1} for a in (self.a1, self.a2, self.a3)],
+            'type': 'graded'
+        }
+        response = self.client.post("/submit_quiz",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'message' : f"Quiz record { self.a1.CID, self.a1.SID, self.a1.LID, self.a1.EID} has been inserted successfully into the database.Engineer failed the course"
+        })
+        marks = [x.marks for x in Quiz_record.query.filter_by(EID=self.a1.EID).order_by(Quiz_record.question)]
+        self.assertEqual(marks, [1, 0, 0])
+
+    # Testing that a graded quiz is scored out of all of its questions
+    def test_submit_quiz_graded_subset_of_questions(self):
+        for question in (self.q1, self.q2, self.q3):
+            question.start = datetime.fromisoformat(question.start)
+            db.session.add(question)
+        db.session.add(Academic_record(EID=self.a1.EID, SID=self.a1.SID, CID=self.a1.CID, start=self.q1.start, status='ongoing'))
+        db.session.commit()
+        request_body = {
+            'LID': self.a1.LID,
+            'SID': self.a1.SID,
+            'CID': self.a1.CID,
+            'start' : self.a1.start,
+            'EID': self.a1.EID,
+            #one right answer sent three times, and an answer to a question outside of the quiz
+            'QAMarks': [{'question': self.q1.question, 'answer': self.q1.answer, 'marks': 1}] * 3 +
+                       [{'question': 'Is this a question?', 'answer': 'YES', 'marks': 1}],
+            'type': 'graded'
+        }
+        response = self.client.post("/submit_quiz",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'message' : f"Quiz record { self.a1.CID, self.a1.SID, self.a1.LID, self.a1.EID} has been inserted successfully into the database.Engineer failed the course"
+        })
+        self.assertEqual([(x.question, x.marks) for x in Quiz_record.query.filter_by(EID=self.a1.EID)], [(self.q1.question, 1)])
+        self.assertEqual(Academic_record.query.filter_by(EID=self.a1.EID).all(), [])
+
+    # Testing that an updated answer is graded against the new answer key
+    def test_submit_quiz_answer_key_refreshed(self):
+        for question in (self.q1, self.q2, self.q3):
+            question.start = datetime.fromisoformat(question.start)
+            db.session.add(question)
+        db.session.commit()
+        answer_keys.get(self.q3.LID, self.q3.SID, self.q3.CID, self.q3.start)
+        response = self.client.post("/update_quiz_question",
+                                    data=json.dumps({'LID': self.q3.LID, 'SID': self.q3.SID, 'CID': self.q3.CID,
+                                                     'start': self.a1.start, 'question': self.q3.question, 'answer': 'EARTH'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        answer_key = answer_keys.get(self.q3.LID, self.q3.SID, self.q3.CID, self.a1.start)
+        self.assertEqual(answer_key[self.q3.question][0], 'EARTH')
+
+    # Testing that a worker sharing a database generation reloads an answer key updated by another worker
+    def test_answer_key_generation_shared(self):
+        shared_generations.use(Database_generation())
+        try:
+            worker = Answer_key_cache(Shared_generations(Database_generation()))
+            for question in (self.q1, self.q2, self.q3):
+                question.start = datetime.fromisoformat(question.start)
+                db.session.add(question)
+            db.session.commit()
+            self.assertEqual(worker.get(self.q3.LID, self.q3.SID, self.q3.CID, self.q3.start)[self.q3.question][0], 'PLUTO')
+            response = self.client.post("/update_quiz_question",
+                                        data=json.dumps({'LID': self.q3.LID, 'SID': self.q3.SID, 'CID': self.q3.CID,
+                                                         'start': self.a1.start, 'question': self.q3.question, 'answer': 'EARTH'}),
+                                        content_type='application/json')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(worker.get(self.q3.LID, self.q3.SID, self.q3.CID, self.a1.start)[self.q3.question][0], 'EARTH')
+        finally:
+            shared_generations.use(Local_generation())
+
     def test_submit_quiz_already_present_ungraded(self):
         t1 = self.b1.start
         #add dummy ungraded quizzes into database
@@ -547,6 +688,108 @@ class TestCheckSubmitQuiz(TestApp):
         self.assertEqual(response.json, {
             'message' : f"Quiz record ['EID', 'SID', 'CID', 'LID', 'start', 'QAMarks', 'type'] is not present, quiz submittion is not successfully"
         })
+
+
+class TestGradeSectionQuiz(TestApp):
+    def add_section_quiz(self, quiz_type='graded'):
+        start = datetime.fromisoformat(self.q1.start)
+        for question in (self.q1, self.q2, self.q3):
+            question.type = quiz_type
+        for row in (self.q1, self.q2, self.q3, self.a1, self.a2, self.a3):
+            row.start = start
+            db.session.add(row)
+        #engineer 2 answers every question correctly but is recorded with no marks
+        for question in (self.q1, self.q2, self.q3):
+            db.session.add(Quiz_record(EID=2, LID='1', SID='G1', CID='IS111', start=start, question=question.question,
+                                       answer_given=question.answer, marks=0))
+        db.session.add(Academic_record(EID=1, SID='G1', CID='IS111', start=start, status='ongoing'))
+        db.session.add(Academic_record(EID=2, SID='G1', CID='IS111', start=start, status='ongoing'))
+        db.session.commit()
+
+    # Testing that every engineer of the section is graded in one request
+    def test_grade_section_quiz(self):
+        self.add_section_quiz()
+        request_body = {
+            'LID': '1',
+            'SID': 'G1',
+            'CID': 'IS111',
+            'start': '2021-10-21 09:15:00'
+        }
+        response = self.client.post("/grade_section_quiz",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'message': "Quiz ('IS111', 'G1', '1') has been graded for 2 engineers",
+            'data': {'passed': [2], 'failed': [1]}
+        })
+        self.assertEqual([(x.EID, x.status) for x in Academic_record.query.all()], [(2, 'completed')])
+        self.assertEqual(sum(x.marks for x in Quiz_record.query.filter_by(EID=2)), 3)
+
+    # Testing that an ungraded quiz does not change the academic records
+    def test_grade_section_quiz_ungraded(self):
+        self.add_section_quiz(quiz_type='ungraded')
+        request_body = {
+            'LID': '1',
+            'SID': 'G1',
+            'CID': 'IS111',
+            'start': '2021-10-21 09:15:00'
+        }
+        response = self.client.post("/grade_section_quiz",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "Quiz ('IS111', 'G1', '1') is not a graded quiz, quiz grading failed"
+        })
+        self.assertEqual([(x.EID, x.status) for x in Academic_record.query.all()], [(1, 'ongoing'), (2, 'ongoing')])
+
+    # Testing that an engineer answering part of the quiz is graded out of every question
+    def test_grade_section_quiz_partial_answers(self):
+        self.add_section_quiz()
+        start = datetime.fromisoformat('2021-10-21 09:15:00')
+        db.session.add(Quiz_record(EID=3, LID='1', SID='G1', CID='IS111', start=start, question=self.q1.question,
+                                   answer_given=self.q1.answer, marks=1))
+        db.session.add(Academic_record(EID=3, SID='G1', CID='IS111', start=start, status='ongoing'))
+        db.session.commit()
+        response = self.client.post("/grade_section_quiz",
+                                    data=json.dumps({'LID': '1', 'SID': 'G1', 'CID': 'IS111', 'start': '2021-10-21 09:15:00'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data'], {'passed': [2], 'failed': [1, 3]})
+
+    # Testing grading of a quiz with no questions
+    def test_grade_section_quiz_no_question(self):
+        request_body = {
+            'LID': '1',
+            'SID': 'G1',
+            'CID': 'IS111',
+            'start': '2021-10-21 09:15:00'
+        }
+        response = self.client.post("/grade_section_quiz",
+                                    data=json.dumps(request_body),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "Quiz question ('IS111', 'G1', '1') do not exist"
+        })
+
+    # Testing grading with a field missing from the request body
+    def test_grade_section_quiz_no_start(self):
+        response = self.client.post("/grade_section_quiz",
+                                    data=json.dumps({'LID': '1', 'SID': 'G1', 'CID': 'IS111'}),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "start is missing from request body, quiz grading failed"
+        })
+
+    # Testing that answers to unknown questions are given no marks
+    def test_grade_section_unknown_question(self):
+        answer_key = {'Is the moon round?': ('YES', 'YES|NO')}
+        rows = [(1, 'Is the moon round?', 'YES'), (1, 'Is the sun round?', 'YES'), (2, 'Is the moon round?', 'NO')]
+        self.assertEqual(grade_section(answer_key, rows), ([1, 0, 0], {1: (1, 2), 2: (0, 1)}))
+
 ### QUIZ TEST CASES ###
 
 if __name__ == '__main__':
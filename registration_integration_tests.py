@@ -1,10 +1,15 @@
 import unittest
 import flask_testing
 import json
+from base64 import urlsafe_b64encode
 
+from sqlalchemy import event
 from sqlalchemy.sql.elements import Null
-from app import app, db, Course, Academic_record, Enrollment, Section
+from app import app, db, Course, Academic_record, Enrollment, Section, Waitlist
 from datetime import datetime
+from tempfile import mkstemp
+from threading import Thread
+import os
 
 
 class TestApp(flask_testing.TestCase):
@@ -204,9 +209,88 @@ class TestHRViewSignup(TestApp):
             })
 
 
+    # Testing function when signups are read one page at a time
+    def test_hr_view_signup_pages(self):
+        t1 = self.er1.start
+
+        # adding dummy signups to database
+        self.er1.start = datetime.fromisoformat(self.er1.start)
+        db.session.add(self.er1)
+        self.er2.start = datetime.fromisoformat(self.er2.start)
+        db.session.add(self.er2)
+        db.session.commit()
+
+        # calling hr_view_signup function via flask route
+        response = self.client.get("/hr_view_signup?limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data'], [
+            {
+            'EID': self.er1.EID,
+            'SID': self.er1.SID,
+            'CID': self.er1.CID,
+            'start': t1
+            }
+        ])
+        self.assertIsNotNone(response.json['next'])
+
+        response = self.client.get("/hr_view_signup", query_string={'limit': 1, 'after': response.json['next']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'data' : [
+                {
+                'EID': self.er2.EID,
+                'SID': self.er2.SID,
+                'CID': self.er2.CID,
+                'start': t1
+                }
+            ],
+            'message' : 'All enrollments are retrieved',
+            'next': None
+            })
+
+
+    # Testing function when the response is streamed
+    def test_hr_view_signup_stream(self):
+        self.er1.start = datetime.fromisoformat(self.er1.start)
+        db.session.add(self.er1)
+        self.er2.start = datetime.fromisoformat(self.er2.start)
+        db.session.add(self.er2)
+        db.session.commit()
+
+        response = self.client.get("/hr_view_signup")
+        streamed = self.client.get("/hr_view_signup?stream=true")
+        self.assertEqual(streamed.status_code, 200)
+        self.assertTrue(streamed.is_streamed)
+        self.assertEqual(json.loads(streamed.get_data(as_text=True)), response.json)
+
+
+    # Testing function when the cursor is invalid
+    def test_hr_view_signup_invalid_cursor(self):
+        response = self.client.get("/hr_view_signup?limit=1&after=abc")
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message' : 'limit or after is invalid'
+        })
+
+    # Testing function when a value of the cursor does not match the type of its column
+    def test_hr_view_signup_cursor_wrong_type(self):
+        for values in ([1, "G1", "IS500", 20210401], ["1", "G1", "IS500", "2021-04-01T09:15:00"]):
+            cursor = urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get("/hr_view_signup", query_string={'limit': 1, 'after': cursor})
+            self.assertEqual(response.status_code, 500)
+            self.assertEqual(response.json, {
+                'message' : 'limit or after is invalid'
+            })
+
+
 class TestHRAssignEngineer(TestApp):
     # Testing positive case where all details are present in request body
     def test_hr_assign_engineer_all_details(self):
+        # adding the section with a seat for the engineer
+        db.session.add(Section(SID=self.cd1.SID, CID=self.cd1.CID, start=datetime.fromisoformat(self.cd1.start),
+                               end=datetime.fromisoformat("2021-05-10 10:09:08"), vacancy=1, TID=1))
+        db.session.commit()
+
         # creating request body for assignment details
         request_body = {
             'EID': self.cd1.EID,
@@ -348,9 +432,11 @@ class TestHRApproveSignup(TestApp):
     def test_hr_approve_signup_in_database(self):
         t1 = self.er1.start
 
-        # adding dummy enrollment into database
+        # adding dummy enrollment and its section into database
         self.er1.start = datetime.fromisoformat(self.er1.start)
         db.session.add(self.er1)
+        db.session.add(Section(SID=self.er1.SID, CID=self.er1.CID, start=self.er1.start,
+                               end=datetime.fromisoformat("2021-05-10 10:09:08"), vacancy=1, TID=1))
         db.session.commit()
 
         # creating request body for course details
@@ -770,6 +856,343 @@ class TestViewEnrollmentByEID(TestApp):
             'message' : 'There are no section enrolled'
             })
 
+
+    # Testing that the course names of many enrollments are read in the same query as the enrollments
+    def test_view_enrollment_by_EID_one_query(self):
+        start = datetime.fromisoformat(self.er1.start)
+        courses = [Course(CID=f'IS{number}', name=f'Course {number}', prerequisites='') for number in range(5)]
+        for course in courses:
+            db.session.add(course)
+            db.session.add(Enrollment(EID=self.er1.EID, SID='G1', CID=course.CID, start=start))
+        db.session.commit()
+
+        statements = []
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", count_statement)
+        try:
+            response = self.client.post("/view_enrollment_by_EID",
+                                data=json.dumps({'EID': self.er1.EID}),
+                                content_type='application/json')
+        finally:
+            event.remove(db.engine, "before_cursor_execute", count_statement)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted((section['CID'], section['course_name']) for section in response.json['data']),
+                         [(course.CID, course.name) for course in courses])
+        self.assertEqual(len([statement for statement in statements if statement.lstrip().upper().startswith('SELECT')]), 1)
+
+class TestSeatReservation(TestApp):
+    def add_section(self, vacancy):
+        self.s1.start = datetime.fromisoformat(self.s1.start)
+        self.s1.end = datetime.fromisoformat(self.s1.end)
+        self.s1.vacancy = vacancy
+        db.session.add(self.s1)
+        db.session.commit()
+
+    def post(self, route, EID):
+        request_body = {
+            'EID': EID,
+            'SID': self.s1.SID,
+            'CID': self.s1.CID,
+            'start': str(self.s1.start)
+        }
+        return self.client.post(route, data=json.dumps(request_body), content_type='application/json')
+
+    # Testing that the seat taken by an assignment is given back on withdrawal
+    def test_assign_and_withdraw_vacancy(self):
+        self.add_section(1)
+        self.assertEqual(self.post("/hr_assign_engineer", 1).status_code, 200)
+        self.assertEqual(Section.query.first().vacancy, 0)
+        self.assertEqual(self.post("/hr_withdraw_engineer", 1).status_code, 200)
+        self.assertEqual(Section.query.first().vacancy, 1)
+
+    # Testing that a signup approved for a full section is waitlisted
+    def test_approve_signup_no_vacancy(self):
+        self.add_section(0)
+        db.session.add(Enrollment(EID=1, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        response = self.post("/hr_approve_signup", 1)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json, {
+            'message': "Section ('G1', 'IS500') has no vacancy, 1 has been added to the waitlist",
+            'data': {
+                'id': 1,
+                'EID': 1,
+                'SID': 'G1',
+                'CID': 'IS500',
+                'start': '2021-04-01 09:15:00'
+            }
+        })
+        self.assertEqual(Academic_record.query.count(), 0)
+        self.assertEqual(Enrollment.query.count(), 0)
+
+    # Testing that a withdrawal gives the seat to the head of the waitlist
+    def test_withdraw_promotes_waitlist(self):
+        self.add_section(1)
+        for EID in (1, 2, 3):
+            db.session.add(Enrollment(EID=EID, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        for EID in (1, 2, 3):
+            self.assertEqual(self.post("/hr_approve_signup", EID).status_code, 200)
+        self.assertEqual([x.EID for x in Waitlist.query.order_by(Waitlist.id)], [2, 3])
+
+        self.assertEqual(self.post("/hr_withdraw_engineer", 1).status_code, 200)
+        self.assertEqual([(x.EID, x.status) for x in Academic_record.query.all()], [(2, 'ongoing')])
+        self.assertEqual(Section.query.first().vacancy, 0)
+        response = self.client.post("/hr_view_waitlist", data=json.dumps({'SID': 'G1', 'CID': 'IS500', 'start': '2021-04-01 09:15:00'}),
+                                    content_type='application/json')
+        self.assertEqual([x['EID'] for x in response.json['data']], [3])
+
+        self.assertEqual(self.post("/engineer_withdraw", 3).status_code, 200)
+        self.assertEqual(self.post("/hr_withdraw_engineer", 2).status_code, 200)
+        self.assertEqual(Section.query.first().vacancy, 1)
+        self.assertEqual(Academic_record.query.count(), 0)
+
+    # Testing that withdrawing a completed record frees no seat and promotes no one
+    def test_withdraw_completed_keeps_waitlist(self):
+        self.add_section(0)
+        db.session.add(Academic_record(EID=1, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start, status='completed'))
+        db.session.add(Waitlist(EID=2, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        self.assertEqual(self.post("/hr_withdraw_engineer", 1).status_code, 200)
+        self.assertEqual(Academic_record.query.count(), 0)
+        self.assertEqual([x.EID for x in Waitlist.query.all()], [2])
+        self.assertEqual(Section.query.first().vacancy, 0)
+
+    # Testing that a new approval waits behind engineers already on the waitlist
+    def test_approve_signup_behind_waitlist(self):
+        self.add_section(1)
+        db.session.add(Waitlist(EID=1, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.add(Enrollment(EID=2, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        response = self.post("/hr_approve_signup", 2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], "Section ('G1', 'IS500') has no vacancy, 2 has been added to the waitlist")
+        self.assertEqual([x.EID for x in Academic_record.query.all()], [1])
+        self.assertEqual([x.EID for x in Waitlist.query.all()], [2])
+        self.assertEqual(Section.query.first().vacancy, 0)
+
+    # Testing that raising the vacancy of a section enrolls the head of its waitlist
+    def test_update_section_promotes_waitlist(self):
+        self.add_section(0)
+        for EID in (1, 2):
+            db.session.add(Waitlist(EID=EID, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        request_body = {'SID': 'G1', 'CID': 'IS500', 'start': '2021-04-01 09:15:00', 'end': '2021-05-01 09:15:00', 'vacancy': 3, 'TID': 1}
+        response = self.client.post("/update_section", data=json.dumps(request_body), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['data']['vacancy'], 1)
+        self.assertEqual(sorted(x.EID for x in Academic_record.query.all()), [1, 2])
+        self.assertEqual(Waitlist.query.count(), 0)
+
+    # Testing that approving a signup of an engineer already waitlisted keeps their place
+    def test_approve_signup_already_waitlisted(self):
+        self.add_section(0)
+        db.session.add(Waitlist(EID=1, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.add(Enrollment(EID=1, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        response = self.post("/hr_approve_signup", 1)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "1 is already enrolled or waitlisted, engineer is not enrolled"
+        })
+        self.assertEqual([x.id for x in Waitlist.query.all()], [1])
+        self.assertEqual(Enrollment.query.count(), 1)
+
+    # Testing negative case where the section does not exist
+    def test_assign_engineer_no_section(self):
+        response = self.post("/hr_assign_engineer", 1)
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "Section ('G1', 'IS500') does not exist, engineer is not assigned"
+        })
+
+
+class TestHRBulk(TestApp):
+    def add_section(self, vacancy, EIDs=()):
+        self.s1.start = datetime.fromisoformat(self.s1.start)
+        self.s1.end = datetime.fromisoformat(self.s1.end)
+        self.s1.vacancy = vacancy
+        db.session.add(self.s1)
+        for EID in EIDs:
+            db.session.add(Enrollment(EID=EID, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+
+    def post(self, route, records):
+        return self.client.post(route, data=json.dumps({'records': records}), content_type='application/json')
+
+    def record(self, EID):
+        return {'EID': EID, 'SID': 'G1', 'CID': 'IS500', 'start': '2021-04-01 09:15:00'}
+
+    # Testing that withdrawing completed records frees no seat
+    def test_hr_withdraw_engineer_bulk_completed(self):
+        self.add_section(0)
+        db.session.add(Academic_record(EID=1, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start, status='completed'))
+        db.session.add(Academic_record(EID=2, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start, status='ongoing'))
+        db.session.add(Waitlist(EID=3, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.add(Waitlist(EID=4, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        response = self.post("/hr_withdraw_engineer_bulk", [self.record(1), self.record(2)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], "2 of 2 records are withdrawn")
+        self.assertEqual([(x.EID, x.status) for x in Academic_record.query.all()], [(3, 'ongoing')])
+        self.assertEqual([x.EID for x in Waitlist.query.all()], [4])
+        self.assertEqual(Section.query.first().vacancy, 0)
+
+    # Testing that signups are enrolled while seats last and waitlisted after
+    def test_hr_approve_signup_bulk(self):
+        self.add_section(2, EIDs=(1, 2, 3))
+        response = self.post("/hr_approve_signup_bulk", [self.record(1), self.record(2), self.record(3), self.record(9),
+                                                         {'SID': 'G1', 'CID': 'IS500', 'start': '2021-04-01 09:15:00'}, self.record(1)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], "3 of 6 records are approved")
+        self.assertEqual([(x['success'], x['message']) for x in response.json['data']], [
+            (True, "1 prerequisites has been moved successfully from Enrollment to academic_record"),
+            (True, "2 prerequisites has been moved successfully from Enrollment to academic_record"),
+            (True, "Section ('G1', 'IS500') has no vacancy, 3 has been added to the waitlist"),
+            (False, "Academic record 9 is not present, engineer is not enrolled"),
+            (False, "['EID'] is not present"),
+            (False, "1 is repeated in the request"),
+        ])
+        self.assertEqual(sorted(x.EID for x in Academic_record.query.all()), [1, 2])
+        self.assertEqual([x.EID for x in Waitlist.query.all()], [3])
+        self.assertEqual(Enrollment.query.count(), 0)
+        self.assertEqual(Section.query.first().vacancy, 0)
+
+    # Testing that bulk approvals wait behind engineers already on the waitlist
+    def test_hr_approve_signup_bulk_behind_waitlist(self):
+        self.add_section(1, EIDs=(1,))
+        db.session.add(Waitlist(EID=5, SID=self.s1.SID, CID=self.s1.CID, start=self.s1.start))
+        db.session.commit()
+        response = self.post("/hr_approve_signup_bulk", [self.record(1)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(x['success'], x['message']) for x in response.json['data']], [
+            (True, "Section ('G1', 'IS500') has no vacancy, 1 has been added to the waitlist"),
+        ])
+        self.assertEqual([x.EID for x in Academic_record.query.all()], [5])
+        self.assertEqual([x.EID for x in Waitlist.query.all()], [1])
+        self.assertEqual(Section.query.first().vacancy, 0)
+
+    # Testing that a record with an invalid field fails alone
+    def test_hr_reject_signup_bulk_invalid_record(self):
+        self.add_section(2, EIDs=(1,))
+        response = self.post("/hr_reject_signup_bulk", [dict(self.record(2), start='bad'), dict(self.record(3), EID=None), self.record(1)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], "1 of 3 records are rejected")
+        self.assertEqual([(x['success'], x['message']) for x in response.json['data']], [
+            (False, "EID 2 or start bad is invalid"),
+            (False, "EID None or start 2021-04-01 09:15:00 is invalid"),
+            (True, "1 has been deleted successfully from Enrollment"),
+        ])
+        self.assertEqual(Enrollment.query.count(), 0)
+
+    # Testing that only signups present are rejected
+    def test_hr_reject_signup_bulk(self):
+        self.add_section(2, EIDs=(1,))
+        response = self.post("/hr_reject_signup_bulk", [self.record(1), self.record(2)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], "1 of 2 records are rejected")
+        self.assertEqual([x['success'] for x in response.json['data']], [True, False])
+        self.assertEqual(Enrollment.query.count(), 0)
+
+    # Testing that assignments stop when the section is full and withdrawals promote the waitlist
+    def test_hr_assign_and_withdraw_engineer_bulk(self):
+        self.add_section(2)
+        response = self.post("/hr_assign_engineer_bulk", [self.record(1), self.record(2), self.record(3)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([(x['success'], x['message']) for x in response.json['data']], [
+            (True, "1 has been inserted successfully into the course details"),
+            (True, "2 has been inserted successfully into the course details"),
+            (False, "Section ('G1', 'IS500') has no vacancy, engineer is not assigned"),
+        ])
+        db.session.add(Waitlist(EID=3, SID='G1', CID='IS500', start=self.s1.start))
+        db.session.commit()
+
+        response = self.post("/hr_withdraw_engineer_bulk", [self.record(1), self.record(2), self.record(4)])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['message'], "2 of 3 records are withdrawn")
+        self.assertEqual([(x.EID, x.status) for x in Academic_record.query.all()], [(3, 'ongoing')])
+        self.assertEqual(Waitlist.query.count(), 0)
+        self.assertEqual(Section.query.first().vacancy, 1)
+
+    # Testing negative case where records is missing from the request body
+    def test_hr_approve_signup_bulk_no_records(self):
+        response = self.client.post("/hr_approve_signup_bulk", data=json.dumps({}), content_type='application/json')
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response.json, {
+            'message': "records is missing, engineers are not enrolled"
+        })
+
+
+class TestSeatReservationConcurrency(TestApp):
+    # approvals run in threads, so they need a database file rather than the shared sqlite:// connection
+    def setUp(self):
+        handle, self.path = mkstemp(suffix='.db')
+        os.close(handle)
+        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:///" + self.path
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+        super().setUp()
+
+    def tearDown(self):
+        super().tearDown()
+        db.get_engine().dispose()
+        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite://"
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+        os.remove(self.path)
+
+    # Testing that concurrent approvals never take more seats than the section has
+    def test_approve_signup_concurrent(self):
+        start = datetime.fromisoformat(self.s1.start)
+        self.s1.start = start
+        self.s1.end = datetime.fromisoformat(self.s1.end)
+        self.s1.vacancy = 5
+        db.session.add(self.s1)
+        for EID in range(40):
+            db.session.add(Enrollment(EID=EID, SID=self.s1.SID, CID=self.s1.CID, start=start))
+        db.session.commit()
+        statuses = list()
+
+        def approve(EIDs):
+            client = app.test_client()
+            for EID in EIDs:
+                request_body = {'EID': EID, 'SID': 'G1', 'CID': 'IS500', 'start': str(start)}
+                response = client.post("/hr_approve_signup", data=json.dumps(request_body), content_type='application/json')
+                statuses.append(response.status_code)
+
+        threads = [Thread(target=approve, args=(range(thread, 40, 8),)) for thread in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * 40)
+        self.assertEqual(Section.query.populate_existing().first().vacancy, 0)
+        self.assertEqual(Academic_record.query.count(), 5)
+        self.assertEqual(Waitlist.query.count(), 35)
+        self.assertEqual(Enrollment.query.count(), 0)
+
+        # concurrent withdrawals each promote a different engineer, in waitlist order
+        enrolled = [x.EID for x in Academic_record.query.all()]
+        head = [x.EID for x in Waitlist.query.order_by(Waitlist.id).limit(5)]
+        statuses.clear()
+
+        def withdraw(EID):
+            request_body = {'EID': EID, 'SID': 'G1', 'CID': 'IS500', 'start': str(start)}
+            response = app.test_client().post("/hr_withdraw_engineer", data=json.dumps(request_body), content_type='application/json')
+            statuses.append(response.status_code)
+
+        threads = [Thread(target=withdraw, args=(EID,)) for EID in enrolled]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(statuses, [200] * 5)
+        self.assertEqual(sorted(x.EID for x in Academic_record.query.all()), sorted(head))
+        self.assertEqual(Waitlist.query.count(), 30)
+        self.assertEqual(Section.query.populate_existing().first().vacancy, 0)
+
+
 ### Registration TEST CASES ###
 
 if __name__ == '__main__':
@@ -122,6 +122,29 @@ INSERT INTO `course` (`CID`,`name`, `prerequisites`) VALUES
 
 ;
 
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `catalog_version`
+--
+
+DROP TABLE IF EXISTS `catalog_version`;
+CREATE TABLE IF NOT EXISTS `catalog_version` (
+  `name` varchar(64) NOT NULL,
+  `generation` int(10) NOT NULL DEFAULT 0,
+  PRIMARY KEY (`name`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8;
+
+--
+-- Dumping data for table `catalog_version`
+--
+
+INSERT INTO `catalog_version` (`name`, `generation`) VALUES
+('course', 0),
+('academic_record', 0),
+('quiz_questions', 0)
+;
+
 -- --------------------------------------------------------
 --
 -- Table structure for table `section`
@@ -137,7 +160,9 @@ CREATE TABLE IF NOT EXISTS `section` (
   `vacancy` int(10) NOT NULL,
   constraint `section_fk1` foreign key(`CID`) references `course`(`CID`),
   constraint `section_fk2` foreign key(`TID`) references `trainer`(`TID`),
-  PRIMARY KEY (`SID`, `CID`, `start`)
+  PRIMARY KEY (`SID`, `CID`, `start`),
+  KEY `section_TID` (`TID`),
+  KEY `section_CID` (`CID`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 
 --
@@ -165,8 +190,10 @@ CREATE TABLE IF NOT EXISTS `lesson` (
   `CID` varchar(64) NOT NULL,
   `SID` varchar(64) NOT NULL,
   `start` datetime NOT NULL, 
+  `next_ordinal` int(10) NOT NULL DEFAULT 0,
   constraint `lesson_fk1` foreign key(`SID`,`CID`, `start`) references `section`(`SID`,`CID`, `start`),
-  PRIMARY KEY (`LID`, `SID`, `CID`, `start`)
+  PRIMARY KEY (`LID`, `SID`, `CID`, `start`),
+  KEY `lesson_SID_CID_start` (`SID`, `CID`, `start`)
 
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 
@@ -175,13 +202,13 @@ CREATE TABLE IF NOT EXISTS `lesson` (
 --
 
 
-INSERT INTO `lesson` (`LID`,`SID`,`CID`, `start`) VALUES
-('1', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime)),
-('2', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime)),
-('3', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime)),
-('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime)),
-('2', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime)),
-('3', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime))
+INSERT INTO `lesson` (`LID`,`SID`,`CID`, `start`, `next_ordinal`) VALUES
+('1', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 2),
+('2', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 1),
+('3', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 1),
+('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 3),
+('2', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 2),
+('3', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 2)
 ;
 
 -- --------------------------------------------------------
@@ -236,7 +263,9 @@ CREATE TABLE IF NOT EXISTS `academic_record` (
   `status` varchar(64) NOT NULL,
   constraint `academic_record_fk1` foreign key(`EID`) references `engineer`(`EID`),
   constraint `academic_record_fk2` foreign key(`SID`,`CID`,`start`) references `section`(`SID`,`CID`,`start`),
-  PRIMARY KEY (`EID`, `SID`, `CID`, `start`)
+  PRIMARY KEY (`EID`, `SID`, `CID`, `start`),
+  KEY `academic_record_EID_status` (`EID`, `status`),
+  KEY `academic_record_CID_status` (`CID`, `status`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 
 --
@@ -264,26 +293,29 @@ CREATE TABLE IF NOT EXISTS `content` (
   `content_type` varchar(64) NOT NULL,
   `content_name` varchar(64) NOT NULL,
   `link` varchar(64) NOT NULL,
+  `ordinal` int(10) NOT NULL,
   constraint `content_fk1` foreign key(`LID`,`SID`,`CID`,`start`) references `lesson`(`LID`,`SID`,`CID`,`start`),
-  PRIMARY KEY (`LID`, `SID`, `CID`, `start`, `content_name`)
+  PRIMARY KEY (`LID`, `SID`, `CID`, `start`, `content_name`),
+  KEY `content_SID_CID_start` (`SID`, `CID`, `start`),
+  UNIQUE KEY `content_lesson_ordinal` (`LID`, `SID`, `CID`, `start`, `ordinal`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
 
 --
 -- Dumping data for table `content`
 --
 
-INSERT INTO `content` (`LID`, `SID`, `CID`, `start`, `content_type`, `content_name`, `link`) VALUES
-('1', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 slides', 'https://tinyurl.com/3yr5dnus'),
-('2', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 2 slides', 'https://tinyurl.com/3yr5dnus'),
-('3', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 3 slides', 'https://tinyurl.com/3yr5dnus'),
-('1', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 slides part 2', 'https://tinyurl.com/3yr5dnus'),
-('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 How to train dragons', 'https://tinyurl.com/3yr5dnus'),
-('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 How get free money', 'https://tinyurl.com/3yr5dnus'),
-('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 Reflections', 'https://tinyurl.com/3yr5dnus'),
-('2', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 2 History of Avarta', 'https://tinyurl.com/3yr5dnus'),
-('2', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 2 Why is machine learning so hard?', 'https://tinyurl.com/3yr5dnus'),
-('3', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 3 Convolution Neural Network', 'https://tinyurl.com/3yr5dnus'),
-('3', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 3 Backward and forward propagation in neural network', 'https://tinyurl.com/3yr5dnus')
+INSERT INTO `content` (`LID`, `SID`, `CID`, `start`, `content_type`, `content_name`, `link`, `ordinal`) VALUES
+('1', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 slides', 'https://tinyurl.com/3yr5dnus', 0),
+('2', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 2 slides', 'https://tinyurl.com/3yr5dnus', 0),
+('3', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 3 slides', 'https://tinyurl.com/3yr5dnus', 0),
+('1', 'G1', 'IS111', CAST('2021-04-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 slides part 2', 'https://tinyurl.com/3yr5dnus', 1),
+('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 How to train dragons', 'https://tinyurl.com/3yr5dnus', 0),
+('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 How get free money', 'https://tinyurl.com/3yr5dnus', 1),
+('1', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 1 Reflections', 'https://tinyurl.com/3yr5dnus', 2),
+('2', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 2 History of Avarta', 'https://tinyurl.com/3yr5dnus', 0),
+('2', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 2 Why is machine learning so hard?', 'https://tinyurl.com/3yr5dnus', 1),
+('3', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 3 Convolution Neural Network', 'https://tinyurl.com/3yr5dnus', 0),
+('3', 'G2', 'IS112', CAST('2021-05-01 09:15:00' AS datetime), 'pdf', 'Lesson 3 Backward and forward propagation in neural network', 'https://tinyurl.com/3yr5dnus', 1)
 ;
 
 -- --------------------------------------------------------
@@ -309,6 +341,27 @@ CREATE TABLE IF NOT EXISTS `enrollment` (
 
 
 
+-- --------------------------------------------------------
+
+--
+-- Table structure for table `waitlist`
+--
+
+DROP TABLE IF EXISTS `waitlist`;
+CREATE TABLE IF NOT EXISTS `waitlist` (
+  `id` int(10) NOT NULL AUTO_INCREMENT,
+  `EID` int(10) NOT NULL,
+  `SID` varchar(64) NOT NULL,
+  `CID` varchar(64) NOT NULL,
+  `start` datetime NOT NULL,
+  constraint `waitlist_fk1` foreign key(`EID`) references `engineer`(`EID`),
+  constraint `waitlist_fk2` foreign key(`SID`, `CID`, `start`) references `section`(`SID`, `CID`,`start`),
+  PRIMARY KEY (`id`),
+  UNIQUE KEY `waitlist_EID_SID_CID_start` (`EID`, `SID`, `CID`, `start`),
+  KEY `waitlist_SID_CID_start_id` (`SID`, `CID`, `start`, `id`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8;
+
+
 -- --------------------------------------------------------
 --
 -- Table structure for table `quiz_record`
@@ -353,6 +406,8 @@ CREATE TABLE IF NOT EXISTS `progress` (
   `latest_lesson_reached` varchar(64) NOT NULL,
   `recent_content_name` varchar(64) NOT NULL,
   `viewed_contents` varchar(64) NOT NULL,
+  `viewed_bitmap` bigint NOT NULL DEFAULT 0,
+  `version` int(10) NOT NULL DEFAULT 0,
   constraint `progress_fk1` foreign key(`EID`) references `engineer`(`EID`),
   PRIMARY KEY (`EID`, `SID`, `CID`, `start`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8;
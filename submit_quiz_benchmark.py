@@ -0,0 +1,49 @@
+import json
+from timeit import default_timer
+from datetime import datetime
+from app import app, db, Quiz_questions
+
+#per-submission latency of /submit_quiz for quizzes of 10, 100 and 1000 questions
+SIZES = [10, 100, 1000]
+SUBMISSIONS = 20
+START = '2021-10-21 09:15:00'
+
+
+def setup_quiz(size):
+    for number in range(size):
+        db.session.add(Quiz_questions(LID=str(size), SID='G1', CID='IS111', start=datetime.fromisoformat(START), question=f'question {number}',
+                                      answer='YES', options='YES|NO', duration=2, type='ungraded'))
+    db.session.commit()
+
+
+def benchmark(client, size):
+    timings = list()
+    for EID in range(SUBMISSIONS):
+        request_body = {
+            'LID': str(size),
+            'SID': 'G1',
+            'CID': 'IS111',
+            'start': START,
+            'EID': EID,
+            'QAMarks': [{'question': f'question {number}', 'answer': 'YES', 'marks': 0} for number in range(size)],
+            'type': 'ungraded'
+        }
+        body = json.dumps(request_body)
+        begin = default_timer()
+        response = client.post("/submit_quiz", data=body, content_type='application/json')
+        timings.append(default_timer() - begin)
+        assert response.status_code == 200, response.json
+    timings.sort()
+    return timings[len(timings) // 2], timings[-1]
+
+
+if __name__ == '__main__':
+    app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite://"
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        for size in SIZES:
+            setup_quiz(size)
+            median, worst = benchmark(client, size)
+            print(f"{size:>5} questions: median {median * 1000:.2f} ms, max {worst * 1000:.2f} ms per submission")
+        db.drop_all()